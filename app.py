@@ -489,11 +489,13 @@ with tabs[0]:
                 df, ['北向成交额', '北向净值'], 
                 '北向资金流向分析', ['#7c3aed', '#06b6d4']
             )
-            st.plotly_chart(fig_north, use_container_width=True)
+            if fig_north:
+                st.plotly_chart(fig_north, use_container_width=True)
         
         with col2:
             fig_index_open = visualization.create_index_open_chart(df)
-            st.plotly_chart(fig_index_open, use_container_width=True)
+            if fig_index_open:
+                st.plotly_chart(fig_index_open, use_container_width=True)
         
         # 两融数据分析
         col1, col2 = st.columns(2)
@@ -549,7 +551,8 @@ with tabs[0]:
         
         with col2:
             fig_index = visualization.create_index_turnover_chart(df)
-            st.plotly_chart(fig_index, use_container_width=True)
+            if fig_index:
+                st.plotly_chart(fig_index, use_container_width=True)
 
     with st.expander(" 涨跌停与市场情绪分析", expanded=True):
         # 市场情绪分析
@@ -561,7 +564,8 @@ with tabs[0]:
         
         with col2:
             fig_board_rate = visualization.create_professional_line_chart(df, ['全天封板率'], '市场封板率趋势', ['#f97316'])
-            st.plotly_chart(fig_board_rate, use_container_width=True)
+            if fig_board_rate:
+                st.plotly_chart(fig_board_rate, use_container_width=True)
         
         # 涨停跌停与大幅波动分析
         st.markdown("#### 涨停跌停与大幅波动分析")
@@ -584,11 +588,13 @@ with tabs[0]:
                 df, ['主板涨停数', '创业板涨停数', '北证涨停数'], 
                 '板块全天涨停板', ['#e11d48', '#f97316', '#7c3aed']
             )
-            st.plotly_chart(fig_full_limit, use_container_width=True)
+            if fig_full_limit:
+                st.plotly_chart(fig_full_limit, use_container_width=True)
         
         with col2:
             fig_limit_chain_enhanced = visualization.create_enhanced_limit_up_analysis_chart(df)
-            st.plotly_chart(fig_limit_chain_enhanced, use_container_width=True)
+            if fig_limit_chain_enhanced:
+                st.plotly_chart(fig_limit_chain_enhanced, use_container_width=True)
         
         col1, col2 = st.columns(2)
         with col1:
@@ -601,7 +607,8 @@ with tabs[0]:
                 df, ['涨幅大于10%', '跌幅于大于10%'], 
                 '大幅波动股票数量', ['#e11d48', '#16a34a']
             )
-            st.plotly_chart(fig_volatility, use_container_width=True)
+            if fig_volatility:
+                st.plotly_chart(fig_volatility, use_container_width=True)
 
     # ==================== 涨停板市值分布分析（仅在此Tab显示） ====================
     with st.expander(" 涨停板市值分布分析", expanded=True):
@@ -2,7 +2,6 @@ import streamlit as st
 import pandas as pd
 import numpy as np
 import plotly.graph_objects as go
-import plotly.express as px
 from datetime import datetime, timedelta
 
 # ==================== 现代化配色方案 ====================
@@ -27,19 +26,68 @@ COLOR_SCHEME = {
     'text': '#1f2937'          # 添加文本颜色
 }
 
+# 报告图表公共布局（透明背景 + 统一边距）
+BASE_LAYOUT = {
+    'paper_bgcolor': 'rgba(0,0,0,0)',
+    'plot_bgcolor': 'rgba(0,0,0,0)',
+    'margin': dict(l=20, r=20, t=50, b=20)
+}
+
+# 评分维度（键, 中文名），顺序即雷达图/条状图的展示顺序
+CATEGORIES = (
+    ('volume', '成交额'),
+    ('north_money', '北向资金'),
+    ('advance_decline', '涨跌家数'),
+    ('limit_up', '涨停板'),
+    ('market_cap', '市值分布'),
+    ('sector_rotation', '板块轮动'),
+    ('sentiment', '市场情绪')
+)
+CAT_KEYS = tuple(k for k, _ in CATEGORIES)
+CAT_LABELS = tuple(v for _, v in CATEGORIES)
+CATEGORY_NAMES = dict(CATEGORIES)
+
+# 评分条颜色等级分界（弱势/偏弱/中性/良好/优秀）
+SCORE_LEVEL_BINS = np.array([40, 50, 60, 70])
+
+# 评分条状图：颜色等级色阶、布局与颜色条
+SCORE_BAR_SCALE = [COLOR_SCHEME['cold'], COLOR_SCHEME['cool'], COLOR_SCHEME['neutral'],
+                   COLOR_SCHEME['warning'], COLOR_SCHEME['hot']]
+SCORE_BAR_LAYOUT = {
+    **BASE_LAYOUT,
+    'height': 300,
+    'showlegend': False,
+    'margin': dict(l=20, r=20, t=20, b=20),
+    'xaxis': {'title': '评分', 'range': [0, 100]},
+    'yaxis': {'title': '维度', 'categoryorder': 'total ascending'}
+}
+SCORE_BAR_COLORBAR = dict(
+    title="评分等级",
+    tickvals=[0, 1, 2, 3, 4],
+    ticktext=['弱势', '偏弱', '中性', '良好', '优秀'],
+    len=0.8,
+    y=0.1,
+    yanchor='bottom'
+)
+
+# 最近8日明细表展示列
+DETAIL_COLUMNS = ('日期', '全天总额', '今昨差额', '北向净值', '全天涨停', '全天跌停', '全天封板率', '上涨', '下跌', '平盘')
+
+# 等级 -> 颜色
+LEVEL_COLOR = {level: COLOR_SCHEME[level] for level in ('hot', 'warm', 'neutral', 'cool', 'cold')}
+
+# 各指标分档阈值（按阈值降序排列）
+TURNOVER_THRESHOLDS = ((1.3, 'hot'), (1.1, 'warm'), (0.9, 'neutral'), (0.7, 'cool'))
+UP_DOWN_THRESHOLDS = ((0.7, 'hot'), (0.55, 'warm'), (0.45, 'neutral'), (0.3, 'cool'))
+LIMIT_UP_THRESHOLDS = ((10, 'hot'), (3, 'warm'), (1, 'neutral'), (0.5, 'cool'))
+
 # ==================== 辅助函数 ====================
 def get_quantile_level(value, thresholds):
-    """根据阈值获取等级和颜色"""
-    sorted_thresholds = sorted(thresholds.keys(), reverse=True)
-    for threshold in sorted_thresholds:
+    """根据降序阈值元组获取等级和颜色，低于所有阈值时取最低一档"""
+    for threshold, level_name in thresholds:
         if value >= threshold:
-            level_name = thresholds[threshold]
-            color = COLOR_SCHEME.get(level_name, COLOR_SCHEME['muted'])
-            return level_name, color
-    min_threshold = min(thresholds.keys())
-    level_name = thresholds[min_threshold]
-    color = COLOR_SCHEME.get(level_name, COLOR_SCHEME['muted'])
-    return level_name, color
+            break
+    return level_name, LEVEL_COLOR[level_name]
 
 # 添加中文解释映射
 LEVEL_CHINESE_MAP = {
@@ -59,143 +107,155 @@ def get_chinese_level(english_level):
     """将英文等级转换为中文解释"""
     return LEVEL_CHINESE_MAP.get(english_level, english_level)
 
+# 涨停板市值分布列（全天）
+CAPITAL_COLUMNS = ('涨停板>100亿(全天）', '50亿<涨停板<100亿(全天）', '20亿<涨停板<50亿(全天）', '涨停板<20亿(全天）')
+
+# 各分析函数读取的最新一行指标
+LATEST_COLUMNS = ('全天总额', '北向净值', '上涨', '下跌', '全天涨停', '全天跌停', '全天封板率',
+                  '主板涨停数', '创业板涨停数', *CAPITAL_COLUMNS)
+
+def get_latest_scalars(df):
+    """最新一行关键指标的标量字典（缺失列记0）；日报入口算一次后传给各分析函数"""
+    return {col: float(df[col].iat[-1]) if col in df.columns else 0.0 for col in LATEST_COLUMNS}
+
+def _latest_row_fingerprint(df):
+    """最新一行的内容指纹，用作只依赖最新一行的图表的缓存键"""
+    return tuple(df.columns), pd.util.hash_pandas_object(df.iloc[-1:], index=False).tolist()
+
+def add_derived_columns(df):
+    """预计算派生列（5日均额、上涨占比），各分析函数直接读取最新行"""
+    derived = {}
+    if '全天总额' in df.columns and '全天总额_ma5' not in df.columns:
+        derived['全天总额_ma5'] = df['全天总额'].rolling(5, min_periods=1).mean()
+    if '上涨' in df.columns and '下跌' in df.columns and '上涨占比' not in df.columns:
+        derived['上涨占比'] = df['上涨'] / (df['上涨'] + df['下跌'] + 1)
+    return df.assign(**derived) if derived else df
+
 # ==================== 六维核心分析 ====================
-def analyze_turnover(df):
-    """成交额分析"""
+def compute_all_metrics(df, scalars=None):
+    """六维市场透视：一次读取最新一行，同时计算成交额、北向、涨跌、涨停、市值分布、板块轮动"""
+    metrics = {}
+    df = add_derived_columns(df)
+    if len(df) == 0:
+        scalars = {}
+    elif scalars is None:
+        scalars = get_latest_scalars(df)
+
+    # 成交额
     if len(df) < 5:
-        return {'value': 0, 'ratio': 1, 'level': '未知', 'color': COLOR_SCHEME['muted']}
-    
-    latest = df.iloc[-1]
-    avg5 = df['全天总额'].tail(5).mean()
-    ratio = latest['全天总额'] / avg5 if avg5 != 0 else 1
-    level, color = get_quantile_level(ratio, {1.3: 'hot', 1.1: 'warm', 0.9: 'neutral', 0.7: 'cool'})
-    return {'value': latest['全天总额'], 'ratio': ratio, 'level': level, 'color': color}
+        metrics['turnover'] = {'value': 0, 'ratio': 1, 'level': '未知', 'color': COLOR_SCHEME['muted']}
+    else:
+        volume = scalars['全天总额']
+        avg5 = df['全天总额_ma5'].iat[-1]
+        ratio = volume / avg5 if avg5 != 0 else 1
+        level, color = get_quantile_level(ratio, TURNOVER_THRESHOLDS)
+        metrics['turnover'] = {'value': volume, 'ratio': ratio, 'level': level, 'color': color}
 
-def analyze_north(df):
-    """北向资金分析"""
-    if len(df) == 0:
-        return {'value': 0, 'level': '未知', 'color': COLOR_SCHEME['muted']}
-    
-    latest = df.iloc[-1]
-    flow = latest.get('北向净值', 0)
+    if not scalars:
+        metrics['north'] = {'value': 0, 'level': '未知', 'color': COLOR_SCHEME['muted']}
+        metrics['up_down'] = {'up': 0, 'down': 0, 'ratio': 0.5, 'level': '未知', 'color': COLOR_SCHEME['muted']}
+        metrics['limit_up'] = {'limit_up': 0, 'limit_down': 0, 'ratio': 1, 'level': '未知', 'color': COLOR_SCHEME['muted']}
+        metrics['cap_dist'] = None
+        metrics['sector_rotation'] = None
+        return metrics
+
+    # 北向资金
+    flow = scalars['北向净值']
     if flow > 50:
         level, color = '积极', COLOR_SCHEME['success']
     elif flow < -30:
         level, color = '谨慎', COLOR_SCHEME['warning']
     else:
         level, color = '中性', COLOR_SCHEME['info']
-    return {'value': flow, 'level': level, 'color': color}
+    metrics['north'] = {'value': flow, 'level': level, 'color': color}
 
-def analyze_up_down(df):
-    """涨跌分析"""
-    if len(df) == 0:
-        return {'up': 0, 'down': 0, 'ratio': 0.5, 'level': '未知', 'color': COLOR_SCHEME['muted']}
-    
-    latest = df.iloc[-1]
-    up = latest.get('上涨', 0)
-    down = latest.get('下跌', 0)
+    # 涨跌
+    up, down = scalars['上涨'], scalars['下跌']
     adv_ratio = up / (up + down + 1e-8)
-    level, color = get_quantile_level(adv_ratio, {0.7: 'hot', 0.55: 'warm', 0.45: 'neutral', 0.3: 'cool'})
-    return {'up': up, 'down': down, 'ratio': adv_ratio, 'level': level, 'color': color}
+    level, color = get_quantile_level(adv_ratio, UP_DOWN_THRESHOLDS)
+    metrics['up_down'] = {'up': up, 'down': down, 'ratio': adv_ratio, 'level': level, 'color': color}
 
-def analyze_limit_up(df):
-    """涨停分析"""
-    if len(df) == 0:
-        return {'limit_up': 0, 'limit_down': 0, 'ratio': 1, 'level': '未知', 'color': COLOR_SCHEME['muted']}
-    
-    latest = df.iloc[-1]
-    lu = latest.get('全天涨停', 0)
-    ld = latest.get('全天跌停', 0)
+    # 涨停
+    lu, ld = scalars['全天涨停'], scalars['全天跌停']
     ratio = lu / (ld + 1e-8)
-    level, color = get_quantile_level(ratio, {10: 'hot', 3: 'warm', 1: 'neutral', 0.5: 'cool'})
-    return {'limit_up': lu, 'limit_down': ld, 'ratio': ratio, 'level': level, 'color': color}
+    level, color = get_quantile_level(ratio, LIMIT_UP_THRESHOLDS)
+    metrics['limit_up'] = {'limit_up': lu, 'limit_down': ld, 'ratio': ratio, 'level': level, 'color': color}
 
-def analyze_cap_dist(df):
-    """市值分布分析"""
-    cols = ['涨停板>100亿(全天）', '50亿<涨停板<100亿(全天）', '20亿<涨停板<50亿(全天）', '涨停板<20亿(全天）']
-    if not all(c in df.columns for c in cols):
-        return None
-    latest = df[cols].iloc[-1].fillna(0)
-    total = latest.sum()
-    if total == 0:
-        return None
-    return latest.to_dict()
+    # 市值分布
+    cap = None
+    if all(c in df.columns for c in CAPITAL_COLUMNS):
+        cap = {c: 0.0 if np.isnan(scalars[c]) else scalars[c] for c in CAPITAL_COLUMNS}
+        if sum(cap.values()) == 0:
+            cap = None
+    metrics['cap_dist'] = cap
 
-def analyze_sector_rotation(df):
-    """板块轮动分析"""
-    if '行业涨停榜' not in df.columns:
-        return None
-    latest = df['行业涨停榜'].iloc[-1]
-    if pd.isna(latest):
-        return None
-    sectors = [s.split('\\') for s in str(latest).split('\\') if s]
-    return [{'name': s[0], 'count': int(s[1]) if len(s) > 1 else 0} for s in sectors[:8]]
+    # 板块轮动
+    rotation = None
+    if '行业涨停榜' in df.columns:
+        latest_sector = df['行业涨停榜'].iat[-1]
+        if not pd.isna(latest_sector):
+            sectors = [s.split('\\') for s in str(latest_sector).split('\\') if s]
+            rotation = [{'name': s[0], 'count': int(s[1]) if len(s) > 1 else 0} for s in sectors[:8]]
+    metrics['sector_rotation'] = rotation
+
+    return metrics
 
 # ==================== 基础情绪指标 ====================
-def analyze_market_sentiment(df):
+# 情绪因子查分表：阈值升序、区间左开右闭（searchsorted side='left'），
+# 原规则中的严格小于边界用 np.nextafter 取其左邻值，保持边界归属不变
+_LIMIT_UP_THR = np.array([np.nextafter(10, -np.inf), 30, 50, 80])
+_LIMIT_UP_SCR = np.array([-10, 5, 10, 15, 20])
+_NORTH_FLOW_THR = np.array([np.nextafter(-30, -np.inf), np.nextafter(-10, -np.inf), 20, 50])
+_NORTH_FLOW_SCR = np.array([-15, -10, 5, 15, 20])
+_UP_RATIO_THR = np.array([np.nextafter(0.3, -np.inf), np.nextafter(0.4, -np.inf), 0.6, 0.7])
+_UP_RATIO_SCR = np.array([-15, -10, 5, 15, 20])
+_VOLUME_TREND_THR = np.array([np.nextafter(-0.1, -np.inf), 0.05, 0.1])
+_VOLUME_TREND_SCR = np.array([-10, 5, 10, 15])
+_SENTIMENT_NEUTRAL = 5
+
+# 情绪因子名称（与因子得分数组一一对应）
+SENTIMENT_FACTOR_NAMES = np.array(['涨停情绪', '资金情绪', '广度情绪', '量能情绪'])
+
+def _lookup_factor(value, thresholds, scores):
+    """按阈值表查情绪因子得分，缺失值记为中性"""
+    if pd.isna(value):
+        return _SENTIMENT_NEUTRAL
+    return int(scores[np.searchsorted(thresholds, value)])
+
+def analyze_market_sentiment(df, scalars=None):
     """综合分析市场情绪"""
     if len(df) < 2:
-        return {'score': 50, 'level': '中性', 'trend': '平稳', 'color': COLOR_SCHEME['neutral']}
+        return {'score': 50, 'level': '中性', 'trend': '平稳', 'color': COLOR_SCHEME['neutral'],
+                'names': SENTIMENT_FACTOR_NAMES, 'values': np.zeros(len(SENTIMENT_FACTOR_NAMES), dtype=np.int16)}
     
+    df = add_derived_columns(df)
     latest = df.iloc[-1]
     prev = df.iloc[-2]
+    if scalars is None:
+        scalars = get_latest_scalars(df)
     
     # 情绪因子计算
     factors = []
     
     # 1. 涨停情绪
     if '全天涨停' in df.columns:
-        limit_up = latest.get('全天涨停', 0)
-        if limit_up > 80:
-            factors.append(20)
-        elif limit_up > 50:
-            factors.append(15)
-        elif limit_up > 30:
-            factors.append(10)
-        elif limit_up < 10:
-            factors.append(-10)
-        else:
-            factors.append(5)
+        limit_up = scalars['全天涨停']
+        factors.append(_lookup_factor(limit_up, _LIMIT_UP_THR, _LIMIT_UP_SCR))
     
     # 2. 资金情绪
     if '北向净值' in df.columns:
-        north_flow = latest.get('北向净值', 0)
-        if north_flow > 50:
-            factors.append(20)
-        elif north_flow > 20:
-            factors.append(15)
-        elif north_flow < -30:
-            factors.append(-15)
-        elif north_flow < -10:
-            factors.append(-10)
-        else:
-            factors.append(5)
+        north_flow = scalars['北向净值']
+        factors.append(_lookup_factor(north_flow, _NORTH_FLOW_THR, _NORTH_FLOW_SCR))
     
     # 3. 广度情绪
     if all(col in df.columns for col in ['上涨', '下跌']):
-        up_ratio = latest['上涨'] / (latest['上涨'] + latest['下跌'] + 1)
-        if up_ratio > 0.7:
-            factors.append(20)
-        elif up_ratio > 0.6:
-            factors.append(15)
-        elif up_ratio < 0.3:
-            factors.append(-15)
-        elif up_ratio < 0.4:
-            factors.append(-10)
-        else:
-            factors.append(5)
+        up_ratio = latest['上涨占比']
+        factors.append(_lookup_factor(up_ratio, _UP_RATIO_THR, _UP_RATIO_SCR))
     
     # 4. 量能情绪
     if '全天总额' in df.columns and len(df) >= 5:
         volume_trend = (latest['全天总额'] - prev['全天总额']) / prev['全天总额']
-        if volume_trend > 0.1:
-            factors.append(15)
-        elif volume_trend > 0.05:
-            factors.append(10)
-        elif volume_trend < -0.1:
-            factors.append(-10)
-        else:
-            factors.append(5)
+        factors.append(_lookup_factor(volume_trend, _VOLUME_TREND_THR, _VOLUME_TREND_SCR))
     
     # 计算综合情绪得分
     sentiment_score = max(0, min(100, 50 + sum(factors)))
@@ -214,19 +274,20 @@ def analyze_market_sentiment(df):
     else:
         level, color, trend = '恐慌', COLOR_SCHEME['cold'], '悲观'
     
+    # 因子得分按顺序填入，缺失的因子记0
+    values = np.zeros(len(SENTIMENT_FACTOR_NAMES), dtype=np.int16)
+    values[:len(factors)] = factors
+    
     return {
         'score': sentiment_score,
         'level': level,
         'trend': trend,
         'color': color,
-        'factors': {
-            '涨停情绪': factors[0] if len(factors) > 0 else 0,
-            '资金情绪': factors[1] if len(factors) > 1 else 0,
-            '广度情绪': factors[2] if len(factors) > 2 else 0,
-            '量能情绪': factors[3] if len(factors) > 3 else 0
-        }
+        'names': SENTIMENT_FACTOR_NAMES,
+        'values': values
     }
 
+@st.cache_data(show_spinner=False)
 def create_sentiment_gauge(sentiment_data):
     """创建情绪指标仪表盘"""
     fig = go.Figure(go.Indicator(
@@ -245,14 +306,7 @@ def create_sentiment_gauge(sentiment_data):
                 {'range': [80, 100], 'color': 'rgba(239, 68, 68, 0.5)'}
             ],
         }
-    ))
-    
-    fig.update_layout(
-        height=250,
-        margin=dict(l=20, r=20, t=50, b=20),
-        paper_bgcolor='rgba(0,0,0,0)',
-        plot_bgcolor='rgba(0,0,0,0)'
-    )
+    ), layout={**BASE_LAYOUT, 'height': 250})
     return fig
 
 # ==================== 综合评分系统 ====================
@@ -271,9 +325,9 @@ class MarketScoringSystem:
     def calculate_volume_score(self, df):
         if '全天总额' not in df.columns or len(df) < 5:
             return 50
-        latest = df.iloc[-1]
+        latest = add_derived_columns(df).iloc[-1]
         current_volume = latest['全天总额']
-        volume_ma5 = df['全天总额'].tail(5).mean()
+        volume_ma5 = latest['全天总额_ma5']
         volume_ratio = current_volume / volume_ma5
         
         if volume_ratio > 1.3:
@@ -290,14 +344,14 @@ class MarketScoringSystem:
         if '北向净值' not in df.columns or len(df) < 3:
             return 50
         
-        latest = df.iloc[-1]
-        north_flow = latest['北向净值']
-        recent_north = df['北向净值'].tail(3)
+        north_arr = df['北向净值'].to_numpy()
+        north_flow = north_arr[-1]
+        recent_north = north_arr[-3:]
         
         trend_score = 0
-        if all(x > 0 for x in recent_north):
+        if (recent_north > 0).all():
             trend_score = 15
-        elif all(x < 0 for x in recent_north):
+        elif (recent_north < 0).all():
             trend_score = -15
         
         if north_flow > 80:
@@ -377,19 +431,12 @@ class MarketScoringSystem:
         return max(0, min(100, score))
     
     def calculate_market_cap_score(self, df):
-        capital_columns = [
-            '涨停板>100亿(全天）', 
-            '50亿<涨停板<100亿(全天）', 
-            '20亿<涨停板<50亿(全天）', 
-            '涨停板<20亿(全天）'
-        ]
-        
-        available_cols = [col for col in capital_columns if col in df.columns]
+        available_cols = [col for col in CAPITAL_COLUMNS if col in df.columns]
         if not available_cols or len(df) == 0:
             return 50
             
-        latest = df.iloc[-1]
-        capital_data = [latest.get(col, 0) for col in available_cols]
+        scalars = get_latest_scalars(df)
+        capital_data = [scalars[col] for col in available_cols]
         total_capital = sum(capital_data)
         
         if total_capital == 0:
@@ -431,7 +478,7 @@ class MarketScoringSystem:
         if len(df) == 0:
             return 50
             
-        latest = df.iloc[-1]
+        latest = add_derived_columns(df).iloc[-1]
         score = 50
         factors = []
         
@@ -454,14 +501,15 @@ class MarketScoringSystem:
                 factors.append(-8)
                 
         if all(col in df.columns for col in ['上涨', '下跌']):
-            up_ratio = latest['上涨'] / (latest['上涨'] + latest['下跌'] + 1)
+            up_ratio = latest['上涨占比']
             if up_ratio > 0.7:
                 factors.append(10)
             elif up_ratio < 0.3:
                 factors.append(-8)
                 
         if '全天总额' in df.columns and len(df) >= 5:
-            volume_trend = (latest['全天总额'] - df['全天总额'].tail(5).mean()) / df['全天总额'].tail(5).mean()
+            volume_ma5 = latest['全天总额_ma5']
+            volume_trend = (latest['全天总额'] - volume_ma5) / volume_ma5
             if volume_trend > 0.1:
                 factors.append(8)
             elif volume_trend < -0.1:
@@ -473,31 +521,36 @@ class MarketScoringSystem:
         return max(0, min(100, score))
     
     def calculate_comprehensive_score(self, df):
+        # 派生列在这里补一次，各维度评分直接读取
+        df = add_derived_columns(df)
         scores = {}
-        total_weight = 0
-        weighted_score = 0
-        
-        for factor, weight in self.weights.items():
+        for factor in self.weights:
             method_name = f'calculate_{factor}_score'
-            if hasattr(self, method_name):
-                score_method = getattr(self, method_name)
-                score = score_method(df)
-                scores[factor] = score
-                weighted_score += score * weight
-                total_weight += weight
-            else:
-                scores[factor] = 50
-                weighted_score += 50 * weight
-                total_weight += weight
-            
+            scores[factor] = getattr(self, method_name)(df) if hasattr(self, method_name) else 50
+        
+        # 加权汇总：评分与权重按同一顺序排成向量，一次点积
+        n = len(self.weights)
+        weights = np.fromiter(self.weights.values(), dtype=np.float64, count=n)
+        values = np.fromiter(scores.values(), dtype=np.float64, count=n)
+        total_weight = weights.sum()
+        
         if total_weight > 0:
-            comprehensive_score = weighted_score / total_weight
+            comprehensive_score = float(values @ weights / total_weight)
         else:
             comprehensive_score = 50
             
         return max(0, min(100, comprehensive_score)), scores
 
+# 评分系统无状态，全模块共用一个实例
+SCORING_SYSTEM = MarketScoringSystem()
+
+@st.cache_data(show_spinner=False)
+def score_market_with_cache(df):
+    """综合评分（按数据内容缓存，市场摘要、交易建议与日报共享同一份结果）"""
+    return SCORING_SYSTEM.calculate_comprehensive_score(df)
+
 # ==================== 可视化组件 ====================
+@st.cache_data(show_spinner=False)
 def create_score_gauge(score, title, color):
     """创建评分仪表盘"""
     fig = go.Figure(go.Indicator(
@@ -520,32 +573,20 @@ def create_score_gauge(score, title, color):
                 'value': 90
             }
         }
-    ))
-    
-    fig.update_layout(
-        height=250, 
-        margin=dict(l=20, r=20, t=50, b=20),
-        paper_bgcolor='rgba(0,0,0,0)',
-        plot_bgcolor='rgba(0,0,0,0)'
-    )
+    ), layout={**BASE_LAYOUT, 'height': 250})
     return fig
 
-def create_market_cap_analysis(df):
+@st.cache_data(show_spinner=False, hash_funcs={pd.DataFrame: _latest_row_fingerprint})
+def create_market_cap_analysis(df, scalars=None):
     """创建市值分布饼图"""
-    capital_columns = [
-        '涨停板>100亿(全天）', 
-        '50亿<涨停板<100亿(全天）', 
-        '20亿<涨停板<50亿(全天）', 
-        '涨停板<20亿(全天）'
-    ]
-    
-    available_cols = [col for col in capital_columns if col in df.columns]
+    available_cols = [col for col in CAPITAL_COLUMNS if col in df.columns]
     if not available_cols or len(df) == 0:
         return None
         
-    latest = df.iloc[-1]
+    if scalars is None:
+        scalars = get_latest_scalars(df)
     labels = ['>100亿', '50-100亿', '20-50亿', '<20亿']
-    values = [latest.get(col, 0) for col in available_cols]
+    values = [scalars[col] for col in available_cols]
     
     colors = [
         COLOR_SCHEME['primary'], 
@@ -554,30 +595,24 @@ def create_market_cap_analysis(df):
         COLOR_SCHEME['warning']
     ]
     
-    fig = go.Figure(data=[
-        go.Pie(
-            labels=labels[:len(available_cols)],
-            values=values,
-            hole=0.4,
-            marker=dict(colors=colors[:len(available_cols)])
-        )
-    ])
-    
-    fig.update_layout(
-        title_text="涨停板市值分布",
-        height=300,
-        showlegend=True,
-        margin=dict(l=20, r=20, t=50, b=20),
-        paper_bgcolor='rgba(0,0,0,0)',
-        plot_bgcolor='rgba(0,0,0,0)'
+    fig = go.Figure(
+        data=[
+            go.Pie(
+                labels=labels[:len(available_cols)],
+                values=values,
+                hole=0.4,
+                marker=dict(colors=colors[:len(available_cols)])
+            )
+        ],
+        layout={**BASE_LAYOUT, 'title_text': "涨停板市值分布", 'height': 300, 'showlegend': True}
     )
     
     return fig
 
 # ==================== 现代化雷达图设计 ====================
+@st.cache_data(show_spinner=False)
 def create_modern_radar_chart(scores, categories):
     """创建现代化雷达图 - 更时尚的设计"""
-    
     # 转换数据格式
     categories_ch = list(categories.values())
     scores_values = [scores.get(k, 50) for k in categories.keys()]
@@ -586,7 +621,36 @@ def create_modern_radar_chart(scores, categories):
     categories_ch.append(categories_ch[0])
     scores_values.append(scores_values[0])
     
-    fig = go.Figure()
+    # 现代化布局
+    fig = go.Figure(layout={
+        **BASE_LAYOUT,
+        'polar': dict(
+            radialaxis=dict(
+                visible=True,
+                range=[0, 100],
+                tickvals=[0, 20, 40, 60, 80, 100],
+                ticktext=['0', '20', '40', '60', '80', '100'],
+                tickfont=dict(size=10, color=COLOR_SCHEME['muted']),
+                gridcolor='rgba(99, 102, 241, 0.2)',
+                linecolor='rgba(99, 102, 241, 0.3)',
+            ),
+            angularaxis=dict(
+                tickfont=dict(size=11, color=COLOR_SCHEME['text']),
+                gridcolor='rgba(99, 102, 241, 0.2)',
+                linecolor='rgba(99, 102, 241, 0.3)',
+                rotation=90  # 从顶部开始
+            ),
+            bgcolor='rgba(0,0,0,0)'
+        ),
+        'showlegend': False,
+        'height': 450,
+        'margin': dict(l=60, r=60, t=80, b=60),
+        'title': dict(
+            text='📊 多维度市场分析雷达图',
+            x=0.5,
+            font=dict(size=16,)
+        )
+    })
     
     # 背景同心圆
     for i in range(20, 101, 20):
@@ -640,63 +704,67 @@ def create_modern_radar_chart(scores, categories):
             font=dict(size=10, color=COLOR_SCHEME['primary'])
         )
     
-    # 现代化布局
-    fig.update_layout(
-        polar=dict(
-            radialaxis=dict(
-                visible=True,
-                range=[0, 100],
-                tickvals=[0, 20, 40, 60, 80, 100],
-                ticktext=['0', '20', '40', '60', '80', '100'],
-                tickfont=dict(size=10, color=COLOR_SCHEME['muted']),
-                gridcolor='rgba(99, 102, 241, 0.2)',
-                linecolor='rgba(99, 102, 241, 0.3)',
-            ),
-            angularaxis=dict(
-                tickfont=dict(size=11, color=COLOR_SCHEME['text']),
-                gridcolor='rgba(99, 102, 241, 0.2)',
-                linecolor='rgba(99, 102, 241, 0.3)',
-                rotation=90  # 从顶部开始
-            ),
-            bgcolor='rgba(0,0,0,0)'
-        ),
-        showlegend=False,
-        height=450,
-        margin=dict(l=60, r=60, t=80, b=60),
-        paper_bgcolor='rgba(0,0,0,0)',
-        plot_bgcolor='rgba(0,0,0,0)',
-        title=dict(
-            text='📊 多维度市场分析雷达图',
-            x=0.5,
-            font=dict(size=16,)
+    return fig
+
+@st.cache_data(show_spinner=False)
+def create_score_bar_chart(factor_scores):
+    """创建各维度评分条状图 - 红涨绿跌配色"""
+    scores = np.fromiter((factor_scores.get(k, 50) for k in CAT_KEYS), dtype=np.float64, count=len(CAT_KEYS))
+
+    # 根据评分高低划分颜色等级：>=70 优秀(4)、>=60 良好(3)、>=50 中性(2)、>=40 偏弱(1)、其余弱势(0)
+    color_scale = np.searchsorted(SCORE_LEVEL_BINS, scores, side='right')
+
+    # 按评分排序，让高分在上方
+    order = np.argsort(scores, kind='stable')
+
+    # 使用连续颜色映射来显示颜色条
+    fig = go.Figure(go.Bar(
+        x=scores[order],
+        y=np.asarray(CAT_LABELS)[order],
+        orientation='h',
+        texttemplate='%{x:.1f}',
+        textposition='outside',
+        marker=dict(
+            color=color_scale[order],  # 使用颜色等级
+            colorscale=SCORE_BAR_SCALE,
+            cmin=0,
+            cmax=4,
+            showscale=True,
+            colorbar=SCORE_BAR_COLORBAR
         )
-    )
+    ), layout=SCORE_BAR_LAYOUT)
     
     return fig
 
 # ==================== 市值分布与板块热点 ====================
-def create_market_cap_bubble(df):
+@st.cache_data(show_spinner=False, hash_funcs={pd.DataFrame: _latest_row_fingerprint})
+def create_market_cap_bubble(df, scalars=None):
     """创建市值分布气泡图"""
-    capital_columns = [
-        '涨停板>100亿(全天）', 
-        '50亿<涨停板<100亿(全天）', 
-        '20亿<涨停板<50亿(全天）', 
-        '涨停板<20亿(全天）'
-    ]
-    
-    available_cols = [col for col in capital_columns if col in df.columns]
+    available_cols = [col for col in CAPITAL_COLUMNS if col in df.columns]
     if not available_cols or len(df) == 0:
         return None
         
-    latest = df.iloc[-1]
+    if scalars is None:
+        scalars = get_latest_scalars(df)
     
     # 创建气泡图数据
-    sizes = [latest.get(col, 0) for col in available_cols]
+    sizes = [scalars[col] for col in available_cols]
     labels = ['>100亿', '50-100亿', '20-50亿', '<20亿']
     colors = [COLOR_SCHEME['hot'], COLOR_SCHEME['warning'], COLOR_SCHEME['neutral'], COLOR_SCHEME['cool']]
     
     # 创建气泡图
-    fig = go.Figure()
+    fig = go.Figure(layout={
+        **BASE_LAYOUT,
+        'title': "💰 涨停市值分布气泡图",
+        'xaxis': dict(
+            title="市值区间",
+            tickvals=list(range(len(labels))),
+            ticktext=labels
+        ),
+        'yaxis': dict(title="涨停数量"),
+        'height': 300,
+        'showlegend': True
+    })
     
     for i, (label, size, color) in enumerate(zip(labels, sizes, colors)):
         fig.add_trace(go.Scatter(
@@ -715,23 +783,9 @@ def create_market_cap_bubble(df):
             hovertemplate="<b>%{text}</b><extra></extra>"
         ))
     
-    fig.update_layout(
-        title="💰 涨停市值分布气泡图",
-        xaxis=dict(
-            title="市值区间",
-            tickvals=list(range(len(labels))),
-            ticktext=labels
-        ),
-        yaxis=dict(title="涨停数量"),
-        height=300,
-        showlegend=True,
-        margin=dict(l=20, r=20, t=50, b=20),
-        paper_bgcolor='rgba(0,0,0,0)',
-        plot_bgcolor='rgba(0,0,0,0)'
-    )
-    
     return fig
 
+@st.cache_data(show_spinner=False, hash_funcs={pd.DataFrame: _latest_row_fingerprint})
 def create_sector_concept_heatmap(df):
     """创建行业概念热点图"""
     if len(df) == 0:
@@ -770,19 +824,14 @@ def create_sector_concept_heatmap(df):
         return None
     
     # 创建热力图数据
-    heat_data = []
     industry_names = [ind[0] for ind in industries]
     concept_names = [con[0] for con in concepts]
-    
-    # 简单模拟热度数据（实际应该基于真实关联）
-    for industry, ind_count in industries:
-        row = []
-        for concept, con_count in concepts:
-            # 热度 = 行业热度 × 概念热度 × 随机因子
-            heat_value = ind_count * con_count * (0.5 + 0.5 * np.random.random())
-            row.append(heat_value)
-        heat_data.append(row)
-    
+
+    # 热度 = 行业热度 × 概念热度（外积，结果确定、每次刷新一致）
+    ind_counts = np.fromiter((c for _, c in industries), dtype=float, count=len(industries))
+    con_counts = np.fromiter((c for _, c in concepts), dtype=float, count=len(concepts))
+    heat_data = np.outer(ind_counts, con_counts)
+
     fig = go.Figure(go.Heatmap(
         z=heat_data,
         x=concept_names,
@@ -790,34 +839,30 @@ def create_sector_concept_heatmap(df):
         colorscale='Reds',
         hoverongaps=False,
         hovertemplate='<b>%{y} × %{x}</b><br>热度: %{z:.1f}<extra></extra>'
-    ))
-    
-    fig.update_layout(
-        title="🔥 行业×概念热点矩阵",
-        height=300,
-        margin=dict(l=20, r=20, t=50, b=20),
-        xaxis_title="概念板块",
-        yaxis_title="行业板块",
-        xaxis_tickangle=-45,
-        paper_bgcolor='rgba(0,0,0,0)',
-        plot_bgcolor='rgba(0,0,0,0)'
-    )
+    ), layout={
+        **BASE_LAYOUT,
+        'title': "🔥 行业×概念热点矩阵",
+        'height': 300,
+        'xaxis': dict(title="概念板块", tickangle=-45),
+        'yaxis': dict(title="行业板块")
+    })
     
     return fig
 
 # ==================== 智能分析函数 ====================
-def generate_comprehensive_analysis(df, scoring_system):
+def generate_comprehensive_analysis(df, scoring_system, scalars=None):
     """生成综合分析"""
     if len(df) == 0:
         return "暂无有效数据"
     
+    df = add_derived_columns(df)
     latest = df.iloc[-1]
     analysis_parts = []
     
     # 量价分析
     if '全天总额' in df.columns and len(df) >= 5:
         volume = latest['全天总额']
-        volume_ma5 = df['全天总额'].tail(5).mean()
+        volume_ma5 = latest['全天总额_ma5']
         volume_ratio = volume / volume_ma5
         
         if volume_ratio > 1.3:
@@ -831,11 +876,13 @@ def generate_comprehensive_analysis(df, scoring_system):
     
     # 资金面分析
     if '北向净值' in df.columns:
-        north_flow = latest['北向净值']
+        north_arr = df['北向净值'].to_numpy()
+        north_flow = north_arr[-1]
         if len(df) >= 3:
-            if all(x > 0 for x in df['北向净值'].tail(3)):
+            recent_north = north_arr[-3:]
+            if (recent_north > 0).all():
                 north_trend = "持续流入"
-            elif all(x < 0 for x in df['北向净值'].tail(3)):
+            elif (recent_north < 0).all():
                 north_trend = "持续流出"
             else:
                 north_trend = "震荡"
@@ -851,7 +898,7 @@ def generate_comprehensive_analysis(df, scoring_system):
     
     # 市场广度分析
     if all(col in df.columns for col in ['上涨', '下跌']):
-        up_ratio = latest['上涨'] / (latest['上涨'] + latest['下跌'] + 1)
+        up_ratio = latest['上涨占比']
         if up_ratio > 0.7:
             analysis_parts.append(f"🌞 **普涨格局**：上涨家数占比{up_ratio:.0%}")
         elif up_ratio < 0.3:
@@ -862,7 +909,7 @@ def generate_comprehensive_analysis(df, scoring_system):
     # 涨停板分析
     if '全天涨停' in df.columns:
         limit_up = latest['全天涨停']
-        board_rate = latest.get('全天封板率', 0)
+        board_rate = (scalars if scalars is not None else get_latest_scalars(df))['全天封板率']
         
         if limit_up > 80:
             analysis_parts.append(f"🔥 **涨停潮现**：{limit_up}家涨停，封板率{board_rate:.1%}")
@@ -873,6 +920,14 @@ def generate_comprehensive_analysis(df, scoring_system):
     
     return " | ".join(analysis_parts)
 
+# 策略建议卡片HTML模板
+_REC_TMPL = (
+    '<div style="background-color: {color}; color: white; padding: 1rem; border-radius: 0.5rem; margin: 0.5rem 0;">'
+    '<h4 style="margin:0; color:white;">{title}</h4>'
+    '<p style="margin:0.5rem 0 0 0; color:white;">{desc}</p>'
+    '</div>'
+)
+
 def generate_ai_strategy_recommendation(total_score, factor_scores):
     """生成AI策略建议"""
     recommendations = []
@@ -890,25 +945,15 @@ def generate_ai_strategy_recommendation(total_score, factor_scores):
         recommendations.append(("💀 **极度保守**", "市场环境恶劣，严格控制风险保持现金", COLOR_SCHEME['error']))
     
     # 具体因子建议
-    factor_names = {
-        'volume': '成交额', 
-        'north_money': '北向资金', 
-        'advance_decline': '涨跌家数',
-        'limit_up': '涨停板', 
-        'market_cap': '市值分布',
-        'sector_rotation': '板块轮动', 
-        'sentiment': '市场情绪'
-    }
-    
     weak_factors = [k for k, v in factor_scores.items() if v < 40]
     strong_factors = [k for k, v in factor_scores.items() if v > 70]
     
     if weak_factors:
-        weak_list = [factor_names.get(f, f) for f in weak_factors]
+        weak_list = [CATEGORY_NAMES.get(f, f) for f in weak_factors]
         recommendations.append(("⚠️ **关注短板**", f"需关注: {', '.join(weak_list)}", COLOR_SCHEME['warning']))
     
     if strong_factors:
-        strong_list = [factor_names.get(f, f) for f in strong_factors if f in factor_names]
+        strong_list = [CATEGORY_NAMES.get(f, f) for f in strong_factors if f in CATEGORY_NAMES]
         if strong_list:
             recommendations.append(("💡 **优势明显**", f"亮点: {', '.join(strong_list)}", COLOR_SCHEME['success']))
     
@@ -921,12 +966,16 @@ def show_daily_report(df):
         st.warning('暂无数据')
         return
         
-    df = df.sort_values('日期').reset_index(drop=True)
+    # 数据加载层已按日期升序整理，仅在乱序时才重新排序
+    if not df['日期'].is_monotonic_increasing:
+        df = df.sort_values('日期', kind='mergesort').reset_index(drop=True)
+    df = add_derived_columns(df)
     latest = df.iloc[-1]
+    # 最新一行关键指标只取一次，传给下面各分析与图表函数
+    last_scalars = get_latest_scalars(df)
     
-    # 初始化评分系统
-    scoring_system = MarketScoringSystem()
-    total_score, factor_scores = scoring_system.calculate_comprehensive_score(df)
+    # 综合评分
+    total_score, factor_scores = score_market_with_cache(df)
     
     # 报告头部
     st.markdown(f"##  智能市场日报 · {latest['日期'].strftime('%Y-%m-%d')}")
@@ -941,60 +990,50 @@ def show_daily_report(df):
 
     with col_radar:
         # 雷达图展示各维度评分
-        categories = {
-            'volume': '成交额',
-            'north_money': '北向资金', 
-            'advance_decline': '涨跌家数',
-            'limit_up': '涨停板',
-            'market_cap': '市值分布',
-            'sector_rotation': '板块轮动',
-            'sentiment': '市场情绪'
-        }
-        radar_fig = create_modern_radar_chart(factor_scores, categories)
+        radar_fig = create_modern_radar_chart(factor_scores, CATEGORY_NAMES)
         st.plotly_chart(radar_fig, use_container_width=True)
     
     # 2. 六维市场透视    
-    col1, col2, col3 = st.columns(3)
+    metrics = compute_all_metrics(df, last_scalars)
+    col1, col2, col3, col4, col5, col6 = st.columns(6)
     
     with col1:
-        to = analyze_turnover(df)
+        to = metrics['turnover']
         st.metric(label='💰 成交额', value=f"{to['value']:,.0f}亿", 
                  delta=f"{to['ratio']:.1%} vs 5日均")
         st.caption(f"状态：{get_chinese_level(to['level'])}")
     
     with col2:
-        no = analyze_north(df)
+        no = metrics['north']
         st.metric(label='🌊 北向净值', value=f"{no['value']:+.1f}亿", 
                  delta=get_chinese_level(no['level']))
         st.caption(f"状态：{get_chinese_level(no['level'])}")
     
     with col3:
-        ud = analyze_up_down(df)
+        ud = metrics['up_down']
         st.metric(label='📈 涨跌比', value=f"{ud['up']}↑ {ud['down']}↓", 
                  delta=f"{ud['ratio']:.1%}")
         st.caption(f"状态：{get_chinese_level(ud['level'])}")
-
-    col4, col5, col6 = st.columns(3)
     
     with col4:
-        lu = analyze_limit_up(df)
+        lu = metrics['limit_up']
         st.metric(label='🎯 涨停/跌停', value=f"{lu['limit_up']}/{lu['limit_down']}", 
                  delta=f"{lu['ratio']:.1f}")
         st.caption(f"状态：{get_chinese_level(lu['level'])}")
     
     with col5:
-        cap = analyze_cap_dist(df)
+        cap = metrics['cap_dist']
         if cap:
             st.markdown('🏦 市值分布（涨停）')
-            st.caption(' | '.join([f"{k.replace('涨停板','')}: {int(v)}" for k, v in cap.items()]))
+            st.caption(' | '.join(f"{k.replace('涨停板','')}: {int(v)}" for k, v in cap.items()))
         else:
             st.caption('暂无市值分布')
     
     with col6:
-        rot = analyze_sector_rotation(df)
+        rot = metrics['sector_rotation']
         if rot:
             st.markdown('🔄 行业涨停前3')
-            st.caption(' | '.join([f"{d['name']}({d['count']})" for d in rot[:3]]))
+            st.caption(' | '.join(f"{d['name']}({d['count']})" for d in rot[:3]))
         else:
             st.caption('暂无板块数据')
     
@@ -1002,7 +1041,7 @@ def show_daily_report(df):
     st.markdown("###  市场情绪指标")
     
     # 计算情绪指标
-    sentiment_data = analyze_market_sentiment(df)
+    sentiment_data = analyze_market_sentiment(df, last_scalars)
     
     col1, col2 = st.columns([1, 1])
     
@@ -1015,31 +1054,34 @@ def show_daily_report(df):
         st.markdown(f"**趋势判断**: {sentiment_data['trend']}")
         st.markdown("**关键因子**:")
         
-        factors = sentiment_data['factors']
-        for factor, value in factors.items():
-            delta_symbol = "📈" if value > 0 else "📉" if value < 0 else "➖"
-            st.write(f"{delta_symbol} {factor}: {'+' if value > 0 else ''}{value}分")
+        values = sentiment_data['values']
+        signs = np.where(values > 0, '📈', np.where(values < 0, '📉', '➖'))
+        prefixes = np.where(values > 0, '+', '')
+        st.markdown('\n\n'.join(
+            f"{sign} {name}: {prefix}{value}分"
+            for sign, name, prefix, value in zip(signs, sentiment_data['names'], prefixes, values)
+        ))
         
         st.progress(sentiment_data['score']/100)
         st.caption(f"情绪综合得分: {sentiment_data['score']:.1f}/100")
     
     # 4. 详细分析
     st.markdown("### 🔍 详细市场分析")
-    analysis = generate_comprehensive_analysis(df, scoring_system)
+    analysis = generate_comprehensive_analysis(df, SCORING_SYSTEM, last_scalars)
     st.info(analysis)
     
     # 5. AI策略建议
     st.markdown("### 💡 AI策略建议")
     recommendations = generate_ai_strategy_recommendation(total_score, factor_scores)
     
-    for title, desc, color in recommendations:
-        st.markdown(
-            f'<div style="background-color: {color}; color: white; padding: 1rem; border-radius: 0.5rem; margin: 0.5rem 0;">'
-            f'<h4 style="margin:0; color:white;">{title}</h4>'
-            f'<p style="margin:0.5rem 0 0 0; color:white;">{desc}</p>'
-            f'</div>',
-            unsafe_allow_html=True
-        )
+    # 所有建议卡片拼接后一次性渲染
+    st.markdown(
+        ''.join(
+            _REC_TMPL.format(color=color, title=title, desc=desc)
+            for title, desc, color in recommendations
+        ),
+        unsafe_allow_html=True
+    )
     
     # 6. 市值分布与板块热点
     st.markdown("###  市值分布与板块热点")
@@ -1048,7 +1090,7 @@ def show_daily_report(df):
 
     with col1:
         # 市值分布气泡图
-        bubble_fig = create_market_cap_bubble(df)
+        bubble_fig = create_market_cap_bubble(df, last_scalars)
         if bubble_fig:
             st.plotly_chart(bubble_fig, use_container_width=True)
         else:
@@ -1067,7 +1109,7 @@ def show_daily_report(df):
     col1, col2 = st.columns(2)
     
     with col1:        
-        cap_fig = create_market_cap_analysis(df)
+        cap_fig = create_market_cap_analysis(df, last_scalars)
         if cap_fig:
             st.plotly_chart(cap_fig, use_container_width=True)
         else:
@@ -1076,105 +1118,27 @@ def show_daily_report(df):
     with col2:
                 
         # 创建评分条状图 - 红涨绿跌配色
-        score_df = pd.DataFrame({
-            '维度': list(categories.values()),
-            '评分': [factor_scores.get(k, 50) for k in categories.keys()]
-        })
-        
-        # 根据评分高低设置颜色：高于50分用红色系，低于50分用绿色系
-        colors = []
-        color_scale = []  # 用于颜色条
-        for score in score_df['评分']:
-            if score >= 70:
-                colors.append(COLOR_SCHEME['hot'])      # 深红 - 优秀
-                color_scale.append(4)
-            elif score >= 60:
-                colors.append(COLOR_SCHEME['warning'])  # 橙色 - 良好
-                color_scale.append(3)
-            elif score >= 50:
-                colors.append(COLOR_SCHEME['neutral'])  # 绿色 - 中性
-                color_scale.append(2)
-            elif score >= 40:
-                colors.append(COLOR_SCHEME['cool'])     # 青色 - 偏弱
-                color_scale.append(1)
-            else:
-                colors.append(COLOR_SCHEME['cold'])     # 靛蓝 - 弱势
-                color_scale.append(0)
-        
-        # 按评分排序，让高分在上方
-        score_df = score_df.sort_values('评分', ascending=True)
-        colors = [colors[i] for i in score_df.index]  # 重新排列颜色
-        color_scale = [color_scale[i] for i in score_df.index]  # 重新排列颜色等级
-        
-        # 使用连续颜色映射来显示颜色条
-        fig = px.bar(
-            score_df, 
-            x='评分', 
-            y='维度', 
-            orientation='h',
-            text='评分',
-            color=color_scale,  # 使用颜色等级
-            color_continuous_scale=[COLOR_SCHEME['cold'], COLOR_SCHEME['cool'], 
-                                   COLOR_SCHEME['neutral'], COLOR_SCHEME['warning'], 
-                                   COLOR_SCHEME['hot']],
-            range_color=[0, 4]
-        )
-        
-        # 更新颜色条设置
-        fig.update_traces(
-            texttemplate='%{x:.1f}',
-            textposition='outside'
-        )
-        
-        fig.update_layout(
-            height=300,
-            showlegend=False,
-            xaxis_range=[0, 100],
-            margin=dict(l=20, r=20, t=20, b=20),
-            paper_bgcolor='rgba(0,0,0,0)',
-            plot_bgcolor='rgba(0,0,0,0)',
-            yaxis={'categoryorder': 'total ascending'},
-            coloraxis_colorbar=dict(
-                title="评分等级",
-                tickvals=[0, 1, 2, 3, 4],
-                ticktext=['弱势', '偏弱', '中性', '良好', '优秀'],
-                len=0.8,
-                y=0.1,
-                yanchor='bottom'
-            )
-        )
-        
-        st.plotly_chart(fig, use_container_width=True)
+        score_fig = create_score_bar_chart(factor_scores)
+        st.plotly_chart(score_fig, use_container_width=True)
         
         # 添加颜色说明
         st.caption("🎨 颜色说明：红色系表示表现优秀，绿色系表示表现中性，蓝色系表示需要关注")
     
     # 8. 最近8日明细
     st.markdown("### 📋 最近8日明细")
-    cols_to_show = ['日期', '全天总额', '今昨差额', '北向净值', '全天涨停', '全天跌停', '全天封板率', '上涨', '下跌', '平盘']
-
     # 检查哪些列实际存在
-    available_cols = [c for c in cols_to_show if c in df.columns]
+    present_cols = frozenset(df.columns)
+    available_cols = [c for c in DETAIL_COLUMNS if c in present_cols]
 
     if available_cols:
-        recent = df[available_cols].tail(8).iloc[::-1]  # 反转，让最新的在顶部
+        # 一次位置索引取最近8行（倒序，让最新的在顶部）及所需列
+        recent = df.iloc[:-9:-1, df.columns.get_indexer(available_cols)]
+        # 转为Arrow列类型，st.dataframe序列化时无需逐单元格转换
+        recent = recent.convert_dtypes(dtype_backend='pyarrow')
         
-        # 格式化数字显示
-        def format_numbers(val):
-            if isinstance(val, (int, float)):
-                if '总额' in str(val) or '差额' in str(val):
-                    return f'{val:,.0f}'
-                elif '净值' in str(val):
-                    return f'{val:+.1f}'
-                elif '率' in str(val):
-                    return f'{val:.1%}'
-            return val
-        
-        # 创建样式化的DataFrame
-        styled_df = recent.copy()
-        for col in styled_df.columns:
-            if col != '日期':
-                styled_df[col] = styled_df[col].apply(format_numbers)
+        # 按列格式化数字显示（数值列保持原始类型，仅在渲染时格式化）
+        number_formats = {'全天总额': '{:,.0f}', '今昨差额': '{:,.0f}', '北向净值': '{:+.1f}', '全天封板率': '{:.1%}'}
+        styled_df = recent.style.format({c: f for c, f in number_formats.items() if c in available_cols})
         
         st.dataframe(
             styled_df,
@@ -1188,36 +1152,40 @@ def show_daily_report(df):
 
     # 9. 交互功能
     st.markdown("---")
+    show_advanced_tools(factor_scores)
+
+    st.markdown('---')
+    st.caption('报告基于历史数据，投资有风险，决策需谨慎。')
+
+@st.fragment
+def show_advanced_tools(factor_scores):
+    """高级分析工具（局部刷新，按钮交互不重绘整份报告）"""
     with st.expander("🔧 高级分析工具", expanded=False):
         col1, col2, col3 = st.columns(3)
         
         with col1:
             if st.button("🔄 更新分析", use_container_width=True):
+                # 更新分析需要重算整份报告，显式触发整页重跑
                 st.rerun()
         
         with col2:
             if st.button("📊 评分详情", use_container_width=True):
                 st.write("### 各维度评分详情")
                 for factor, score in factor_scores.items():
-                    st.write(f"- {categories.get(factor, factor)}: {score:.1f}分")
+                    st.write(f"- {CATEGORY_NAMES.get(factor, factor)}: {score:.1f}分")
         
         with col3:
             if st.button("💾 导出报告", use_container_width=True):
                 st.info("报告导出功能开发中...")
 
-    st.markdown('---')
-    st.caption('报告基于历史数据，投资有风险，决策需谨慎。')
-
 # ==================== 兼容函数 ====================
 def generate_market_summary(df):
     """生成市场摘要"""
-    scoring_system = MarketScoringSystem()
-    return generate_comprehensive_analysis(df, scoring_system)
+    return generate_comprehensive_analysis(df, SCORING_SYSTEM)
 
 def generate_trading_advice(df):
     """生成交易建议"""
-    scoring_system = MarketScoringSystem()
-    total_score, factor_scores = scoring_system.calculate_comprehensive_score(df)
+    total_score, factor_scores = score_market_with_cache(add_derived_columns(df))
     recommendations = generate_ai_strategy_recommendation(total_score, factor_scores)
     
     if recommendations:
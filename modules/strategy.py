@@ -3,77 +3,197 @@ import pandas as pd
 import numpy as np
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
+from numpy.lib.stride_tricks import sliding_window_view
 import warnings
 warnings.filterwarnings('ignore')
 
+# 交易动作编码（回测内核中只记录整数编码，循环结束后再映射为名称）
+TRADE_BUY, TRADE_SELL, TRADE_STOP_LOSS = 0, 1, 2
+TRADE_ACTIONS = ('BUY', 'SELL', 'STOP_LOSS')
+
+def _run_backtest(signal, pct_change, initial_capital, transaction_cost, stop_loss):
+    """回测状态机内核：只在数值数组上逐日推进持仓状态（pct_change需已按止盈截断）"""
+    n = len(signal)
+    equity = np.empty(n)
+    capital_arr = np.empty(n)
+    position_arr = np.empty(n)
+    # 交易记录按最大可能数量预分配，结束后按实际笔数截断
+    trade_idx = np.empty(n, dtype=np.int64)
+    trade_code = np.empty(n, dtype=np.int8)
+    trade_capital = np.empty(n)
+    trade_value = np.empty(n)
+    n_trades = 0
+    
+    capital = initial_capital
+    position = 0
+    max_capital = initial_capital
+    drawdown = 0
+    
+    for i, (sig, pct) in enumerate(zip(signal.tolist(), pct_change.tolist())):
+        # 计算当前权益
+        current_equity = capital + position
+        equity[i] = current_equity
+        capital_arr[i] = capital
+        position_arr[i] = position
+        
+        # 更新最大资本和回撤
+        if current_equity > max_capital:
+            max_capital = current_equity
+        current_drawdown = (max_capital - current_equity) / max_capital
+        drawdown = max(drawdown, current_drawdown)
+        
+        # 止损检查
+        if position > 0 and current_drawdown > stop_loss:
+            # 止损平仓
+            capital = position * (1 - stop_loss - transaction_cost)
+            position = 0
+            trade_idx[n_trades], trade_code[n_trades] = i, TRADE_STOP_LOSS
+            trade_capital[n_trades], trade_value[n_trades] = capital, 0
+            n_trades += 1
+            continue
+        
+        if sig == 1 and position == 0:  # 买入
+            # 全仓买入
+            position = capital * (1 - transaction_cost)
+            capital = 0
+            trade_idx[n_trades], trade_code[n_trades] = i, TRADE_BUY
+            trade_capital[n_trades], trade_value[n_trades] = current_equity, position
+            n_trades += 1
+            
+        elif sig == -1 and position > 0:  # 卖出
+            capital = position * (1 + pct - transaction_cost)
+            position = 0
+            trade_idx[n_trades], trade_code[n_trades] = i, TRADE_SELL
+            trade_capital[n_trades], trade_value[n_trades] = capital, pct
+            n_trades += 1
+    
+    # 最终平仓
+    if position > 0:
+        capital += position
+    
+    return (equity, capital_arr, position_arr,
+            trade_idx[:n_trades], trade_code[:n_trades], trade_capital[:n_trades], trade_value[:n_trades],
+            drawdown, capital)
+
+def _build_trades(dates, trade_idx, trade_code, trade_capital, trade_value):
+    """将内核输出的交易数组还原为交易记录列表"""
+    trades = []
+    for i, code, cap, value in zip(trade_idx.tolist(), trade_code.tolist(),
+                                   trade_capital.tolist(), trade_value.tolist()):
+        record = {'date': dates[i], 'action': TRADE_ACTIONS[code], 'capital': cap, 'price': 'N/A'}
+        if code == TRADE_SELL:
+            record['pct_change'] = value
+        else:
+            record['shares'] = value
+        trades.append(record)
+    return trades
+
+def _roll_stat(a, window, fn, **kwargs):
+    """基于滑动窗口视图计算滚动统计量，窗口未满的位置为NaN（与pandas rolling一致）"""
+    out = np.full(len(a), np.nan)
+    if len(a) >= window:
+        out[window - 1:] = fn(sliding_window_view(a, window), axis=-1, **kwargs)
+    return out
+
+def _make_signal(buy_mask, sell_mask):
+    """由买卖条件生成交易信号（1买入，-1卖出，0观望；同时满足时以卖出为准）"""
+    return np.select([sell_mask, buy_mask], [-1, 1], 0).astype(np.int8)
+
+@st.cache_data(show_spinner=False)
+def _compute_indicators(df):
+    """计算技术指标（按数据内容缓存，重复回测时直接复用）"""
+    # 各指标先算入字典，最后一次性拼接进数据表，避免逐列插入
+    ind = {}
+    
+    # 价格相关指标（使用成交额代理）
+    if '全天总额' in df.columns:
+        price = df['全天总额']
+    
+        # 移动平均
+        ind['MA5'] = price.rolling(window=5).mean()
+        ind['MA10'] = price.rolling(window=10).mean()
+        # 20日均值与标准差由MA20和布林带共用，只计算一次
+        rolling20 = price.rolling(window=20)
+        m20 = rolling20.mean()
+        s20 = rolling20.std()
+        ind['MA20'] = m20
+    
+        # 布林带
+        ind['BB_Middle'] = m20
+        ind['BB_Upper'] = m20 + 2 * s20
+        ind['BB_Lower'] = m20 - 2 * s20
+        ind['BB_Width'] = (ind['BB_Upper'] - ind['BB_Lower']) / ind['BB_Middle']
+    
+        # RSI (相对强弱指标)
+        # 涨跌幅拆分为上涨/下跌部分（fmax/fmin将首日的NaN视为0）
+        delta = price.diff().to_numpy()
+        gain = _roll_stat(np.fmax(delta, 0.0), 14, np.mean)
+        loss = _roll_stat(-np.fmin(delta, 0.0), 14, np.mean)
+        rs = gain / (loss + 1e-8)
+        ind['RSI'] = 100 - (100 / (1 + rs))
+    
+        # MACD
+        exp1 = price.ewm(span=12).mean()
+        exp2 = price.ewm(span=26).mean()
+        ind['MACD'] = exp1 - exp2
+        ind['MACD_Signal'] = ind['MACD'].ewm(span=9).mean()
+        ind['MACD_Histogram'] = ind['MACD'] - ind['MACD_Signal']
+    
+    # 市场情绪指标
+    if all(col in df.columns for col in ['上涨', '下跌', '平盘']):
+        ind['涨跌比'] = (df['上涨'] + 1) / (df['下跌'] + 1)
+        ind['上涨率'] = df['上涨'] / (df['上涨'] + df['下跌'] + df['平盘'])
+    
+    # 资金流指标
+    if '北向净值' in df.columns:
+        ind['北向_MA5'] = df['北向净值'].rolling(window=5).mean()
+        ind['北向_MA10'] = df['北向净值'].rolling(window=10).mean()
+    
+    # 涨停板指标
+    if '全天涨停' in df.columns:
+        ind['涨停_MA5'] = df['全天涨停'].rolling(window=5).mean()
+        ind['涨停动量'] = df['全天涨停'] / ind['涨停_MA5'] - 1
+    
+    # 平滑类技术指标无需float64精度，降为float32以减少内存占用
+    # （上涨率参与回测收益计算、涨跌比为原始比值，保持原精度）
+    for col in ind.keys() - {'上涨率', '涨跌比'}:
+        ind[col] = ind[col].astype(np.float32)
+    
+    if ind:
+        df = pd.concat([df.drop(columns=list(ind), errors='ignore'), pd.DataFrame(ind, index=df.index)], axis=1)
+    
+    return df
+
 class StrategyBacktester:
     """策略回测器类"""
     
     def __init__(self, df, initial_capital=100000):
-        self.df = df.copy()
+        # 回测器只新增/整列替换列，浅拷贝即可保证不改动调用方的数据表
+        self.df = df.copy(deep=False)
         self.initial_capital = initial_capital
         self.results = {}
+        # 技术指标只依赖原始数据，同一回测器内只需计算一次
+        self._indicators_ready = False
     
     def calculate_technical_indicators(self):
         """计算技术指标"""
-        df = self.df
-        
-        # 价格相关指标（使用成交额代理）
-        if '全天总额' in df.columns:
-            # 移动平均
-            df['MA5'] = df['全天总额'].rolling(window=5).mean()
-            df['MA10'] = df['全天总额'].rolling(window=10).mean()
-            df['MA20'] = df['全天总额'].rolling(window=20).mean()
-            
-            # 布林带
-            df['BB_Middle'] = df['全天总额'].rolling(window=20).mean()
-            df['BB_Upper'] = df['BB_Middle'] + 2 * df['全天总额'].rolling(window=20).std()
-            df['BB_Lower'] = df['BB_Middle'] - 2 * df['全天总额'].rolling(window=20).std()
-            df['BB_Width'] = (df['BB_Upper'] - df['BB_Lower']) / df['BB_Middle']
-            
-            # RSI (相对强弱指标)
-            delta = df['全天总额'].diff()
-            gain = (delta.where(delta > 0, 0)).rolling(window=14).mean()
-            loss = (-delta.where(delta < 0, 0)).rolling(window=14).mean()
-            rs = gain / (loss + 1e-8)
-            df['RSI'] = 100 - (100 / (1 + rs))
-            
-            # MACD
-            exp1 = df['全天总额'].ewm(span=12).mean()
-            exp2 = df['全天总额'].ewm(span=26).mean()
-            df['MACD'] = exp1 - exp2
-            df['MACD_Signal'] = df['MACD'].ewm(span=9).mean()
-            df['MACD_Histogram'] = df['MACD'] - df['MACD_Signal']
-        
-        # 市场情绪指标
-        if all(col in df.columns for col in ['上涨', '下跌', '平盘']):
-            df['涨跌比'] = (df['上涨'] + 1) / (df['下跌'] + 1)
-            df['上涨率'] = df['上涨'] / (df['上涨'] + df['下跌'] + df['平盘'])
+        if self._indicators_ready:
+            return self.df
         
-        # 资金流指标
-        if '北向净值' in df.columns:
-            df['北向_MA5'] = df['北向净值'].rolling(window=5).mean()
-            df['北向_MA10'] = df['北向净值'].rolling(window=10).mean()
-        
-        # 涨停板指标
-        if '全天涨停' in df.columns:
-            df['涨停_MA5'] = df['全天涨停'].rolling(window=5).mean()
-            df['涨停动量'] = df['全天涨停'] / df['涨停_MA5'] - 1
-        
-        self.df = df
-        return df
+        self.df = _compute_indicators(self.df)
+        self._indicators_ready = True
+        return self.df
 
     def momentum_strategy(self, window=5, threshold=0.1):
         """动量策略"""
         df = self.calculate_technical_indicators()
         
-        # 基于成交额动量
-        df['volume_momentum'] = df['全天总额'] / df['全天总额'].rolling(window=window).mean() - 1
+        # 基于成交额动量（中间量只在数组上计算，不写入数据表）
+        price = df['全天总额'].to_numpy(dtype=float)
+        momentum = price / _roll_stat(price, window, np.mean) - 1
         
         # 生成信号
-        df['signal'] = 0
-        df.loc[df['volume_momentum'] > threshold, 'signal'] = 1  # 买入
-        df.loc[df['volume_momentum'] < -threshold, 'signal'] = -1  # 卖出
+        df['signal'] = _make_signal(momentum > threshold, momentum < -threshold)
         
         return df
 
@@ -82,15 +202,12 @@ class StrategyBacktester:
         df = self.calculate_technical_indicators()
         
         if '全天总额' in df.columns:
-            # 计算Z-score
-            df['mean'] = df['全天总额'].rolling(window=window).mean()
-            df['std'] = df['全天总额'].rolling(window=window).std()
-            df['z_score'] = (df['全天总额'] - df['mean']) / (df['std'] + 1e-8)
+            # 计算Z-score（中间量只在数组上计算，不写入数据表）
+            price = df['全天总额'].to_numpy(dtype=float)
+            z_score = (price - _roll_stat(price, window, np.mean)) / (_roll_stat(price, window, np.std, ddof=1) + 1e-8)
             
-            # 生成信号
-            df['signal'] = 0
-            df.loc[df['z_score'] < -z_threshold, 'signal'] = 1  # 超卖，买入
-            df.loc[df['z_score'] > z_threshold, 'signal'] = -1  # 超买，卖出
+            # 生成信号：超卖买入，超买卖出
+            df['signal'] = _make_signal(z_score < -z_threshold, z_score > z_threshold)
         
         return df
 
@@ -100,13 +217,15 @@ class StrategyBacktester:
         
         if '全天总额' in df.columns:
             # 计算阻力位和支撑位
-            df['resistance'] = df['全天总额'].rolling(window=window).max()
-            df['support'] = df['全天总额'].rolling(window=window).min()
+            price = df['全天总额'].to_numpy(dtype=float)
+            df['resistance'] = _roll_stat(price, window, np.max)
+            df['support'] = _roll_stat(price, window, np.min)
             
-            # 突破信号
-            df['signal'] = 0
-            df.loc[df['全天总额'] > df['resistance'].shift(1) * multiplier, 'signal'] = 1  # 向上突破
-            df.loc[df['全天总额'] < df['support'].shift(1) / multiplier, 'signal'] = -1  # 向下突破
+            # 突破信号：向上突破买入，向下突破卖出
+            df['signal'] = _make_signal(
+                price > df['resistance'].shift(1).to_numpy() * multiplier,
+                price < df['support'].shift(1).to_numpy() / multiplier
+            )
         
         return df
 
@@ -120,14 +239,13 @@ class StrategyBacktester:
             df['advance_ratio'] = df['上涨'] / total_stocks
             df['limit_up_ratio'] = df['全天涨停'] / total_stocks
             
-            # 情绪极端化信号
-            df['signal'] = 0
-            # 情绪冰点买入
-            df.loc[(df['advance_ratio'] < (1 - extreme_threshold)) & 
-                  (df['limit_up_ratio'] < 0.01), 'signal'] = 1
-            # 情绪狂热卖出
-            df.loc[(df['advance_ratio'] > extreme_threshold) & 
-                  (df['limit_up_ratio'] > 0.03), 'signal'] = -1
+            # 情绪极端化信号：情绪冰点买入，情绪狂热卖出
+            advance_ratio = df['advance_ratio'].to_numpy()
+            limit_up_ratio = df['limit_up_ratio'].to_numpy()
+            df['signal'] = _make_signal(
+                (advance_ratio < (1 - extreme_threshold)) & (limit_up_ratio < 0.01),
+                (advance_ratio > extreme_threshold) & (limit_up_ratio > 0.03)
+            )
         
         return df
 
@@ -139,11 +257,34 @@ class StrategyBacktester:
             # 北向资金连续流入流出
             df['north_trend'] = df['北向净值'].rolling(window=window).sum()
             
-            df['signal'] = 0
-            # 连续大幅流入买入
-            df.loc[df['north_trend'] > threshold, 'signal'] = 1
-            # 连续大幅流出卖出
-            df.loc[df['north_trend'] < -threshold, 'signal'] = -1
+            # 连续大幅流入买入，连续大幅流出卖出
+            north_trend = df['north_trend'].to_numpy()
+            df['signal'] = _make_signal(north_trend > threshold, north_trend < -threshold)
+        
+        return df
+
+    def combined_strategy(self):
+        """多策略组合（各策略按默认参数投票）"""
+        df = self.calculate_technical_indicators()
+        strategies = (
+            self.momentum_strategy,
+            self.mean_reversion_strategy,
+            self.breakout_strategy,
+            self.sentiment_strategy,
+            self.north_money_strategy
+        )
+        
+        # 技术指标只计算一次，各策略信号写入同一个信号矩阵
+        signals = np.zeros((len(df), len(strategies)), dtype=np.int8)
+        for k, strategy in enumerate(strategies):
+            # 缺少所需数据的策略不产生信号，避免沿用上一个策略的结果
+            df.drop(columns='signal', inplace=True, errors='ignore')
+            strategy()
+            if 'signal' in df.columns:
+                signals[:, k] = df['signal'].to_numpy()
+        
+        # 多数策略看多则买入，多数看空则卖出
+        df['signal'] = np.sign(signals.sum(axis=1)).astype(np.int8)
         
         return df
 
@@ -152,86 +293,25 @@ class StrategyBacktester:
         if 'signal' not in strategy_df.columns:
             return None
         
-        capital = self.initial_capital
-        position = 0
-        trades = []
-        equity_curve = []
-        max_capital = self.initial_capital
-        drawdown = 0
-        
-        for i, row in strategy_df.iterrows():
-            current_date = row['日期'] if '日期' in row else i
-            
-            # 计算当前权益
-            current_equity = capital + position
-            equity_curve.append({
-                'date': current_date,
-                'equity': current_equity,
-                'capital': capital,
-                'position': position
-            })
-            
-            # 更新最大资本和回撤
-            if current_equity > max_capital:
-                max_capital = current_equity
-            current_drawdown = (max_capital - current_equity) / max_capital
-            drawdown = max(drawdown, current_drawdown)
-            
-            # 止损检查
-            if position > 0 and current_drawdown > stop_loss:
-                # 止损平仓
-                capital = position * (1 - stop_loss - transaction_cost)
-                trades.append({
-                    'date': current_date, 
-                    'action': 'STOP_LOSS', 
-                    'capital': capital,
-                    'price': 'N/A',
-                    'shares': 0
-                })
-                position = 0
-                continue
-            
-            # 策略信号处理
-            signal = row['signal']
-            
-            if signal == 1 and position == 0:  # 买入
-                # 全仓买入
-                position = capital * (1 - transaction_cost)
-                capital = 0
-                trades.append({
-                    'date': current_date,
-                    'action': 'BUY',
-                    'capital': current_equity,
-                    'price': 'N/A',
-                    'shares': position
-                })
-                
-            elif signal == -1 and position > 0:  # 卖出
-                # 计算收益（简化：基于市场情绪）
-                if '上涨率' in row and not pd.isna(row['上涨率']):
-                    # 根据市场上涨率估算收益
-                    pct_change = row['上涨率'] * 0.1  # 简化收益计算
-                else:
-                    pct_change = 0.02  # 默认2%收益
-                
-                # 止盈检查
-                if pct_change > take_profit:
-                    pct_change = take_profit
-                
-                capital = position * (1 + pct_change - transaction_cost)
-                position = 0
-                trades.append({
-                    'date': current_date,
-                    'action': 'SELL',
-                    'capital': capital,
-                    'price': 'N/A',
-                    'pct_change': pct_change
-                })
+        # 一次性取出底层数组，逐行循环只做数组下标访问
+        signal = strategy_df['signal'].to_numpy()
+        if '上涨率' in strategy_df.columns:
+            up_rate = strategy_df['上涨率'].to_numpy(dtype=float)
+            # 根据市场上涨率估算收益（简化），缺失时默认2%收益
+            pct_change = np.where(np.isnan(up_rate), 0.02, up_rate * 0.1)
+        else:
+            pct_change = np.full(len(strategy_df), 0.02)
+        # 止盈：整列一次截断，循环内不再逐笔判断
+        pct_change = np.minimum(pct_change, take_profit)
+        dates = strategy_df['日期'].array if '日期' in strategy_df.columns else strategy_df.index.array
         
-        # 最终平仓
-        if position > 0:
-            capital += position
-            position = 0
+        (equity, capital_arr, position_arr,
+         trade_idx, trade_code, trade_capital, trade_value,
+         drawdown, capital) = _run_backtest(
+            signal, pct_change, self.initial_capital,
+            transaction_cost, stop_loss
+        )
+        trades = _build_trades(dates, trade_idx, trade_code, trade_capital, trade_value)
         
         # 计算绩效指标
         final_equity = capital
@@ -245,18 +325,15 @@ class StrategyBacktester:
             annual_return = total_return
         
         # 夏普比率（简化）
-        if len(equity_curve) > 1:
-            returns = pd.Series([curve['equity'] for curve in equity_curve]).pct_change().dropna()
+        if len(equity) > 1:
+            returns = pd.Series(equity).pct_change().dropna()
             sharpe_ratio = returns.mean() / (returns.std() + 1e-8) * np.sqrt(252)
         else:
             sharpe_ratio = 0
         
-        # 胜率
-        if len(trades) >= 2:
-            profitable_trades = len([t for t in trades if t.get('pct_change', 0) > 0])
-            win_rate = profitable_trades / len([t for t in trades if 'pct_change' in t])
-        else:
-            win_rate = 0
+        # 胜率（按卖出交易的收益率统计）
+        sell_pcts = trade_value[trade_code == TRADE_SELL]
+        win_rate = float((sell_pcts > 0).mean()) if len(sell_pcts) else 0
         
         self.results = {
             'final_capital': final_equity,
@@ -267,21 +344,31 @@ class StrategyBacktester:
             'win_rate': win_rate,
             'total_trades': len(trades),
             'trades': trades,
-            'equity_curve': equity_curve,
+            # 逐日权益/资金/持仓以并列数组保存
+            'dates': dates,
+            'equity': equity,
+            'capital': capital_arr,
+            'position': position_arr,
             'strategy_df': strategy_df
         }
         
         return self.results
-
-def create_comprehensive_strategy_chart(results):
-    """创建综合策略图表"""
-    if not results or 'strategy_df' not in results:
-        return None
     
-    df = results['strategy_df']
-    equity_curve = results['equity_curve']
-    
-    # 创建子图
+    @property
+    def equity_curve(self):
+        """逐日权益记录（由回测结果数组按需还原为原有的字典列表格式）"""
+        if 'equity' not in self.results:
+            return []
+        r = self.results
+        # tolist 转为原生 float，与原先逐日记录的数值类型一致
+        return [
+            {'date': d, 'equity': e, 'capital': c, 'position': p}
+            for d, e, c, p in zip(r['dates'], r['equity'].tolist(), r['capital'].tolist(), r['position'].tolist())
+        ]
+
+@st.cache_resource
+def _strategy_chart_layout():
+    """综合策略图表的子图布局骨架（子图网格、标题和坐标轴只构建一次）"""
     fig = make_subplots(
         rows=3, cols=1,
         subplot_titles=('策略信号与成交额', '资金曲线', '回撤分析'),
@@ -289,106 +376,122 @@ def create_comprehensive_strategy_chart(results):
         row_heights=[0.4, 0.3, 0.3]
     )
     
+    fig.update_layout(
+        height=800,
+        showlegend=True,
+        title_text="策略回测综合分析"
+    )
+    
+    fig.update_xaxes(title_text="日期", row=3, col=1)
+    fig.update_yaxes(title_text="成交额", row=1, col=1)
+    fig.update_yaxes(title_text="资金", row=2, col=1)
+    fig.update_yaxes(title_text="回撤率", row=3, col=1)
+    
+    return fig.layout.to_plotly_json()
+
+def create_comprehensive_strategy_chart(results):
+    """创建综合策略图表"""
+    if not results or 'strategy_df' not in results:
+        return None
+    
+    df = results['strategy_df']
+    equity = results.get('equity')
+    has_equity = equity is not None and len(equity) > 0
+    # 各子图曲线直接指定所属坐标轴，最后与布局骨架一起构建图表
+    # 折线和信号点使用WebGL渲染，长周期回测时浏览器端更流畅
+    traces = []
+    
     # 第一子图：策略信号
     if '全天总额' in df.columns:
-        fig.add_trace(
-            go.Scatter(
+        traces.append(
+            go.Scattergl(
                 x=df['日期'], 
                 y=df['全天总额'],
                 mode='lines',
                 name='成交额',
-                line=dict(color='#1f77b4', width=2)
-            ),
-            row=1, col=1
+                line=dict(color='#1f77b4', width=2),
+                xaxis='x', yaxis='y'
+            )
         )
     
+    # 买卖信号：在原始数组上取位置索引，不再筛选出子表
+    signal = df['signal'].to_numpy()
+    signal_dates = df['日期'].to_numpy()
+    volume = df['全天总额'].to_numpy() if '全天总额' in df.columns else np.ones(len(df))
+    buy_idx = np.flatnonzero(signal == 1)
+    sell_idx = np.flatnonzero(signal == -1)
+    
     # 买入信号
-    buy_signals = df[df['signal'] == 1]
-    if len(buy_signals) > 0:
-        fig.add_trace(
-            go.Scatter(
-                x=buy_signals['日期'],
-                y=buy_signals.get('全天总额', [1] * len(buy_signals)) * 1.02,
+    if len(buy_idx) > 0:
+        traces.append(
+            go.Scattergl(
+                x=signal_dates[buy_idx],
+                y=volume[buy_idx] * 1.02,
                 mode='markers',
                 name='买入信号',
-                marker=dict(color='green', size=10, symbol='triangle-up')
-            ),
-            row=1, col=1
+                marker=dict(color='green', size=10, symbol='triangle-up'),
+                xaxis='x', yaxis='y'
+            )
         )
     
     # 卖出信号
-    sell_signals = df[df['signal'] == -1]
-    if len(sell_signals) > 0:
-        fig.add_trace(
-            go.Scatter(
-                x=sell_signals['日期'],
-                y=sell_signals.get('全天总额', [1] * len(sell_signals)) * 0.98,
+    if len(sell_idx) > 0:
+        traces.append(
+            go.Scattergl(
+                x=signal_dates[sell_idx],
+                y=volume[sell_idx] * 0.98,
                 mode='markers',
                 name='卖出信号',
-                marker=dict(color='red', size=10, symbol='triangle-down')
-            ),
-            row=1, col=1
+                marker=dict(color='red', size=10, symbol='triangle-down'),
+                xaxis='x', yaxis='y'
+            )
         )
     
     # 第二子图：资金曲线
-    if equity_curve:
-        dates = [point['date'] for point in equity_curve]
-        equity = [point['equity'] for point in equity_curve]
+    if has_equity:
+        dates = results['dates']
         
-        fig.add_trace(
-            go.Scatter(
+        traces.append(
+            go.Scattergl(
                 x=dates,
                 y=equity,
                 mode='lines',
                 name='资金曲线',
-                line=dict(color='#00ff00', width=3)
-            ),
-            row=2, col=1
+                line=dict(color='#00ff00', width=3),
+                xaxis='x2', yaxis='y2'
+            )
         )
         
         # 初始资金线
-        initial_capital = equity_curve[0]['equity'] if equity_curve else 0
-        fig.add_trace(
-            go.Scatter(
+        traces.append(
+            go.Scattergl(
                 x=dates,
-                y=[initial_capital] * len(dates),
+                y=np.full(len(dates), equity[0]),
                 mode='lines',
                 name='初始资金',
-                line=dict(color='white', width=1, dash='dash')
-            ),
-            row=2, col=1
+                line=dict(color='white', width=1, dash='dash'),
+                xaxis='x2', yaxis='y2'
+            )
         )
     
     # 第三子图：回撤分析
-    if equity_curve:
-        equity_series = pd.Series([point['equity'] for point in equity_curve])
-        rolling_max = equity_series.expanding().max()
-        drawdown = (rolling_max - equity_series) / rolling_max
+    if has_equity:
+        rolling_max = np.maximum.accumulate(equity)
+        drawdown = (rolling_max - equity) / rolling_max
         
-        fig.add_trace(
+        traces.append(
             go.Scatter(
                 x=dates,
                 y=drawdown,
                 mode='lines',
                 name='回撤',
                 line=dict(color='#ff6b6b', width=2),
-                fill='tozeroy'
-            ),
-            row=3, col=1
+                fill='tozeroy',
+                xaxis='x3', yaxis='y3'
+            )
         )
     
-    fig.update_layout(
-        height=800,
-        showlegend=True,
-        title_text="策略回测综合分析"
-    )
-    
-    fig.update_xaxes(title_text="日期", row=3, col=1)
-    fig.update_yaxes(title_text="成交额", row=1, col=1)
-    fig.update_yaxes(title_text="资金", row=2, col=1)
-    fig.update_yaxes(title_text="回撤率", row=3, col=1)
-    
-    return fig
+    return go.Figure(data=traces, layout=_strategy_chart_layout())
 
 def show_backtest_dashboard(df):
     """显示增强版策略回测仪表板"""
@@ -488,8 +591,8 @@ def show_backtest_dashboard(df):
                 elif strategy_type == "北向资金策略":
                     strategy_df = backtester.north_money_strategy(window, threshold)
                 else:
-                    # 多策略组合（简单平均）
-                    strategy_df = backtester.momentum_strategy()
+                    # 多策略组合（信号投票）
+                    strategy_df = backtester.combined_strategy()
                 
                 # 执行回测
                 results = backtester.backtest(strategy_df, transaction_cost, stop_loss, take_profit)
@@ -634,11 +737,13 @@ def calculate_momentum_strategy(df, window=5):
     return backtester.momentum_strategy(window)
 
 def backtest_strategy(strategy_df, initial_capital=100000):
-    """兼容原有函数"""
+    """兼容原有函数（结果中保留原有的 equity_curve 字典列表）"""
     backtester = StrategyBacktester(strategy_df, initial_capital)
-    return backtester.backtest(strategy_df)
+    results = backtester.backtest(strategy_df)
+    results['equity_curve'] = backtester.equity_curve
+    return results
 
 def create_strategy_chart(strategy_df):
     """兼容原有函数"""
-    results = {'strategy_df': strategy_df, 'equity_curve': []}
+    results = {'strategy_df': strategy_df}
     return create_comprehensive_strategy_chart(results)
\ No newline at end of file
@@ -2,6 +2,9 @@
 # 功能：与 app.py 的主题切换兼容，所有图表自动响应 st.session_state.theme
 # ------------------------------
 
+import functools
+import hashlib
+
 import streamlit as st
 import plotly.graph_objects as go
 import pandas as pd
@@ -11,29 +14,34 @@ import numpy as np
 # 1. 动态主题适配
 # ==========================
 
+PLOT_STYLES = {
+    "light": {
+        "title_color": "#1e293b",
+        "axis_color": "#334155",
+        "grid_color": "#e2e8f0",
+        "line_color": "#94a3b8",
+        "plot_bgcolor": "#ffffff",
+        "paper_bgcolor": "#ffffff",
+        "legend_bg": "rgba(255,255,255,0.5)"
+    },
+    "dark": {
+        "title_color": "#ffffff",
+        "axis_color": "#e2e8f0",
+        "grid_color": "#334155",
+        "line_color": "#475569",
+        "plot_bgcolor": "#0f172a",
+        "paper_bgcolor": "#0f172a",
+        "legend_bg": "rgba(30,41,59,0.8)"
+    }
+}
+
+def _current_theme():
+    """当前主题：light 或 dark"""
+    return "light" if st.session_state.get("theme", "dark") == "light" else "dark"
+
 def get_plot_style():
-    """根据当前主题返回 Plotly 样式"""
-    theme = st.session_state.get("theme", "dark")
-    if theme == "light":
-        return {
-            "title_color": "#1e293b",
-            "axis_color": "#334155",
-            "grid_color": "#e2e8f0",
-            "line_color": "#94a3b8",
-            "plot_bgcolor": "#ffffff",
-            "paper_bgcolor": "#ffffff",
-            "legend_bg": "rgba(255,255,255,0.5)"
-        }
-    else:
-        return {
-            "title_color": "#ffffff",
-            "axis_color": "#e2e8f0",
-            "grid_color": "#334155",
-            "line_color": "#475569",
-            "plot_bgcolor": "#0f172a",
-            "paper_bgcolor": "#0f172a",
-            "legend_bg": "rgba(30,41,59,0.8)"
-        }
+    """根据当前主题返回 Plotly 样式（模块级常量，调用方只读）"""
+    return PLOT_STYLES[_current_theme()]
 
 PLOTLY_CONFIG = {
     "scrollZoom": True,
@@ -46,6 +54,11 @@ def find_column(df, target_column):
     """容错匹配列名"""
     if target_column in df.columns:
         return target_column
+    return _fuzzy_match_column(tuple(df.columns), target_column)
+
+@functools.lru_cache(maxsize=1024)
+def _fuzzy_match_column(columns, target_column):
+    """括号/空格变体与子串匹配，按（列名元组, 目标列）缓存，避免每次逐列扫描"""
     variants = [
         target_column,
         target_column.replace('（', '(').replace('）', ')'),
@@ -53,174 +66,266 @@ def find_column(df, target_column):
         target_column.replace(' ', '')
     ]
     for v in variants:
-        if v in df.columns:
+        if v in columns:
             return v
-    for col in df.columns:
+    for col in columns:
         if target_column.replace('(', '').replace(')', '') in col:
             return col
     return None
 
+def _find_columns(df, targets):
+    """批量匹配列名，返回 {目标列: 实际列或None}，同一图表内复用"""
+    return {t: find_column(df, t) for t in targets}
+
+LTTB_MAX_POINTS = 1500  # 折线图最多发送到前端的点数
+WEBGL_MIN_POINTS = 500  # 超过该点数的折线改用 WebGL 渲染
+
+def _scatter_type(n_points):
+    """点数多时用 scattergl（WebGL），少时保留 SVG 以保证清晰度"""
+    return 'scattergl' if n_points > WEBGL_MIN_POINTS else 'scatter'
+
+def _lttb_indices(y, n_out):
+    """LTTB（最大三角形）降采样，返回保留点的位置"""
+    n = len(y)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+    # 首尾点固定，中间n-2个点均分为n_out-2个桶
+    edges = np.append(np.linspace(1, n - 1, n_out - 1).astype(np.intp), n)
+    csum = np.concatenate(([0.0], np.cumsum(y, dtype=np.float64)))
+    lo, hi = edges[1:-1], edges[2:]
+    next_x = (lo + hi - 1) / 2.0
+    next_y = (csum[hi] - csum[lo]) / (hi - lo)
+
+    idx = np.empty(n_out, dtype=np.intp)
+    idx[0], idx[-1] = 0, n - 1
+    a = 0
+    for i in range(n_out - 2):
+        start, stop = edges[i], edges[i + 1]
+        xs = np.arange(start, stop)
+        area = np.abs((a - next_x[i]) * (y[start:stop] - y[a]) - (a - xs) * (next_y[i] - y[a]))
+        a = start + int(np.argmax(area))
+        idx[i + 1] = a
+    return idx
+
+def _downsample_rows(df, columns, max_points=LTTB_MAX_POINTS):
+    """长序列折线图按LTTB抽取行；多列取并集，保证各条线共用同一批日期"""
+    if len(df) <= max_points:
+        return df
+    keep = [_lttb_indices(_col_values(df, col), max_points) for col in columns]
+    if not keep:
+        return df
+    return df.iloc[np.unique(np.concatenate(keep))]
+
+_BASE_LAYOUTS = {}  # 主题 -> 图表共用布局
+
+def _base_layout():
+    """图表共用布局（背景、坐标轴、图例配色），每个主题只构建一次"""
+    theme = _current_theme()
+    layout = _BASE_LAYOUTS.get(theme)
+    if layout is None:
+        style = get_plot_style()
+
+        def axis(**kwargs):
+            # 每个坐标轴单独建字典，避免 x/y 轴共用同一个 title 对象
+            return dict(gridcolor=style["grid_color"], linecolor=style["line_color"],
+                        tickfont=dict(color=style["axis_color"]),
+                        title=dict(font=dict(color=style["axis_color"])), **kwargs)
+
+        layout = _BASE_LAYOUTS[theme] = dict(
+            title=dict(x=0.5, font=dict(size=16, color=style["title_color"])),
+            hovermode='x unified',
+            plot_bgcolor=style["plot_bgcolor"], paper_bgcolor=style["paper_bgcolor"],
+            xaxis=axis(type='category'),
+            yaxis=axis(),
+            legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="center", x=0.5,
+                        bgcolor=style["legend_bg"], font=dict(color=style["axis_color"]))
+        )
+    return layout
+
+def _col_values(df, col):
+    """列数值数组（NaN补0），直接交给 Plotly"""
+    # 金额/家数/比率按 ,.0f 或 .1% 显示，float32 精度足够，前端数据量减半
+    # copy=True 保证得到独立数组，之后原地补0不会改到 df
+    values = df[col].to_numpy(dtype=np.float32, na_value=np.nan, copy=True)
+    return np.nan_to_num(values, copy=False, nan=0.0)
+
+_DATE_STR_CACHE = {}  # 日期列内容 -> 日期字符串，同一份数据的多张图只格式化一次
+
+def _format_dates(dates):
+    """日期向量化格式化为 YYYY-MM-DD（替代逐行 strftime）"""
+    return np.datetime_as_string(np.asarray(dates, dtype='datetime64[D]'), unit='D')
+
+def _date_str(df):
+    """横轴日期字符串（无日期列时用索引）"""
+    if '日期' not in df.columns:
+        return df.index.astype(str).to_numpy()
+    dates = df['日期'].to_numpy()
+    if dates.dtype.kind != 'M':
+        # 非 datetime64（如字符串日期）的 object 数组字节是对象指针，不能做缓存键，直接格式化
+        return _format_dates(dates)
+    key = (dates.dtype.str, dates.view('i8').tobytes())
+    cached = _DATE_STR_CACHE.get(key)
+    if cached is None:
+        if len(_DATE_STR_CACHE) >= 32:
+            _DATE_STR_CACHE.clear()
+        cached = _DATE_STR_CACHE[key] = _format_dates(dates)
+    return cached
+
+_CHART_BUILDERS = {}  # 函数名 -> 未缓存的图表函数
+
+def _frame_fingerprint(df):
+    """DataFrame 内容指纹：数值列直接哈希内存，文本列用 pandas 向量化哈希"""
+    h = hashlib.blake2b(digest_size=16)
+    h.update(repr((df.shape, tuple(df.columns))).encode())
+    h.update(pd.util.hash_array(np.asarray(df.index), categorize=False).tobytes())
+    for _, col in df.items():
+        values = col.to_numpy()
+        if values.dtype == object:
+            values = pd.util.hash_array(values, categorize=False)
+        h.update(values.tobytes())
+    return h.hexdigest()
+
+@st.cache_resource(show_spinner=False, max_entries=128, hash_funcs={pd.DataFrame: _frame_fingerprint})
+def _build_cached_figure(name, df, args, kwargs, theme):
+    """按（图表、数据内容、参数、主题）缓存 Figure；theme 只参与缓存键"""
+    return _CHART_BUILDERS[name](df, *args, **dict(kwargs))
+
+def _cached_figure(builder):
+    """图表函数装饰器：数据未变的重跑直接复用已构建的 Figure（调用方只读，不可修改）"""
+    _CHART_BUILDERS[builder.__name__] = builder
+
+    @functools.wraps(builder)
+    def wrapper(df, *args, **kwargs):
+        return _build_cached_figure(builder.__name__, df, args, tuple(sorted(kwargs.items())),
+                                    _current_theme())
+    return wrapper
+
 # ==========================
 # 2. 基础图表函数
 # ==========================
 
+# 悬停模板：系列名取自 trace 的 meta，各 trace 共用同一字符串
+HOVER_VALUE = '<b>%{meta}</b><br>日期: %{x}<br>数值: %{y:,.0f}<extra></extra>'
+HOVER_PERCENT = '<b>%{meta}</b><br>日期: %{x}<br>数值: %{y:.1%}<extra></extra>'
+HOVER_COUNT = '<b>%{meta}</b><br>日期: %{x}<br>数量: %{y:,.0f}<extra></extra>'
+
+def _new_figure(traces):
+    """由 trace 字典和共用布局直接构建图表（跳过逐属性校验）"""
+    return go.Figure(data=traces, layout=_base_layout(), _validate=False)
+
+@_cached_figure
 def create_grouped_bar_chart(df, am_column, full_column, title):
     """分组柱状图：上午 vs 全天"""
-    style = get_plot_style()
     am_actual = find_column(df, am_column)
     full_actual = find_column(df, full_column)
     
     if not am_actual or not full_actual:
         return None
         
-    df = df.copy()
-    df['日期_str'] = df['日期'].dt.strftime('%Y-%m-%d') if '日期' in df.columns else df.index.astype(str)
-    
-    fig = go.Figure()
-    
-    # 上午数据（橙色）
-    fig.add_trace(go.Bar(
-        x=df.index, y=df[am_actual].fillna(0),
-        name='上午', marker_color='#f97316', opacity=0.9, width=0.4,
-        hovertemplate=f'<b>上午 {am_actual}</b><br>日期: %{{customdata}}<br>数值: %{{y:,.0f}}<extra></extra>',
-        customdata=df['日期_str']
-    ))
-    
-    # 全天数据（红色）
-    fig.add_trace(go.Bar(
-        x=df.index, y=df[full_actual].fillna(0),
-        name='全天', marker_color='#dc2626', opacity=0.9, width=0.4,
-        hovertemplate=f'<b>全天 {full_actual}</b><br>日期: %{{customdata}}<br>数值: %{{y:,.0f}}<extra></extra>',
-        customdata=df['日期_str']
-    ))
+    date_str = _date_str(df)
+    
+    fig = _new_figure([
+        # 上午数据（橙色）
+        dict(type='bar', x=date_str, y=_col_values(df, am_actual),
+             name='上午', marker=dict(color='#f97316'), opacity=0.9, width=0.4,
+             meta=f'上午 {am_actual}', hovertemplate=HOVER_VALUE),
+        # 全天数据（红色）
+        dict(type='bar', x=date_str, y=_col_values(df, full_actual),
+             name='全天', marker=dict(color='#dc2626'), opacity=0.9, width=0.4,
+             meta=f'全天 {full_actual}', hovertemplate=HOVER_VALUE)
+    ])
     
     fig.update_layout(
-        title=dict(text=title, x=0.5, font=dict(size=16, color=style["title_color"])),
-        barmode='group', height=400, hovermode='x unified',
-        plot_bgcolor=style["plot_bgcolor"], paper_bgcolor=style["paper_bgcolor"],
-        xaxis=dict(
-            title='日期', tickvals=df.index, ticktext=df['日期_str'], type='category',
-            gridcolor=style["grid_color"], linecolor=style["line_color"],
-            tickfont=dict(color=style["axis_color"]), title_font=dict(color=style["axis_color"])
-        ),
-        yaxis=dict(
-            title='金额', gridcolor=style["grid_color"], linecolor=style["line_color"],
-            tickfont=dict(color=style["axis_color"]), title_font=dict(color=style["axis_color"])
-        ),
-        legend=dict(
-            orientation="h", yanchor="bottom", y=1.02, xanchor="center", x=0.5,
-            bgcolor=style["legend_bg"], font=dict(color=style["axis_color"])
-        )
+        title_text=title, barmode='group', height=400,
+        xaxis_title_text='日期',
+        yaxis_title_text='金额'
     )
     return fig
 
-# 成交额柱子
+# 成交额柱子折线颜色：按顺序匹配列名关键字，全部命中即采用
+STACKED_LINE_COLORS = (
+    (('总额', '全天'), '#06b6d4'),  # 湖蓝色：总成交额
+    (('沪',), '#e11d48'),
+    (('深',), '#f97316'),
+)
+STACKED_LINE_DEFAULT = '#7c3aed'  # 创业/创额
+
+@_cached_figure
 def create_stacked_daily_chart(df, am_column, full_column, title):
-    style = get_plot_style()
     am_actual  = find_column(df, am_column)
     full_actual = find_column(df, full_column)
     if not am_actual or not full_actual:
         return None
 
-    df = df.copy()
-    df['日期_str'] = df['日期'].dt.strftime('%Y-%m-%d') if '日期' in df.columns else df.index.astype(str)
-
-    am_data  = df[am_actual].fillna(0)
-    full_data = df[full_actual].fillna(0)
-    pm_data  = (full_data - am_data).clip(lower=0)
-
-    fig = go.Figure()
-
-    # 上午柱
-    fig.add_trace(go.Bar(x=df.index, y=am_data, name='上午',
-                         marker_color='#f97316', opacity=0.9, width=0.4,
-                         hovertemplate='上午<br>日期: %{customdata}<br>数值: %{y:,.0f}<extra></extra>',
-                         customdata=df['日期_str']))
-
-    # 下午柱
-    fig.add_trace(go.Bar(x=df.index, y=pm_data, name='下午',
-                         marker_color='#dc2626', opacity=0.9, width=0.4,
-                         hovertemplate='下午<br>日期: %{customdata}<br>数值: %{y:,.0f}<extra></extra>',
-                         customdata=df['日期_str']))
-
-       # 全天折线：总成交额用湖蓝，其余按市场
-    if '总额' in full_actual and '全天' in full_actual:      # ← 关键判断
-        line_color = '#06b6d4'      # 湖蓝色
-    else:
-        line_color = '#e11d48' if '沪' in full_actual else \
-                     '#f97316' if '深' in full_actual else \
-                     '#7c3aed'      # 创业/创额
-    fig.add_trace(go.Scatter(
-        x=df.index, y=full_data,
-        mode='lines+markers', name='全天',
-        line=dict(color=line_color, width=1.5),
-        marker=dict(size=4, color=line_color),
-        hovertemplate='全天<br>日期: %{customdata}<br>数值: %{y:,.0f}<extra></extra>',
-        customdata=df['日期_str']
-    ))
+    date_str = _date_str(df)
+
+    am_data  = _col_values(df, am_actual)
+    full_data = _col_values(df, full_actual)
+    pm_data  = full_data - am_data
+    np.maximum(pm_data, 0.0, out=pm_data)
+
+    # 全天折线：总成交额用湖蓝，其余按市场
+    line_color = next((color for keys, color in STACKED_LINE_COLORS
+                       if all(k in full_actual for k in keys)), STACKED_LINE_DEFAULT)
+
+    fig = _new_figure([
+        # 上午柱
+        dict(type='bar', x=date_str, y=am_data, name='上午',
+             marker=dict(color='#f97316'), opacity=0.9, width=0.4,
+             hovertemplate='上午<br>日期: %{x}<br>数值: %{y:,.0f}<extra></extra>'),
+        # 下午柱
+        dict(type='bar', x=date_str, y=pm_data, name='下午',
+             marker=dict(color='#dc2626'), opacity=0.9, width=0.4,
+             hovertemplate='下午<br>日期: %{x}<br>数值: %{y:,.0f}<extra></extra>'),
+        dict(type=_scatter_type(len(df)), x=date_str, y=full_data,
+             mode='lines+markers', name='全天',
+             line=dict(color=line_color, width=1.5),
+             marker=dict(size=4, color=line_color),
+             hovertemplate='全天<br>日期: %{x}<br>数值: %{y:,.0f}<extra></extra>')
+    ])
 
     fig.update_layout(
-        title=dict(text=title, x=0.5, font=dict(color=style["title_color"], size=16)),
-        barmode='stack', height=400, hovermode='x unified',
-        plot_bgcolor=style["plot_bgcolor"], paper_bgcolor=style["paper_bgcolor"],
-        xaxis=dict(type='category', tickvals=df.index, ticktext=df['日期_str'],
-                   gridcolor=style["grid_color"], linecolor=style["line_color"],
-                   tickfont=dict(color=style["axis_color"]), title_font=dict(color=style["axis_color"])),
-        yaxis=dict(title='金额', gridcolor=style["grid_color"], linecolor=style["line_color"],
-                   tickfont=dict(color=style["axis_color"]), title_font=dict(color=style["axis_color"])),
-        legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="center", x=0.5,
-                    bgcolor=style["legend_bg"], font=dict(color=style["axis_color"]))
+        title_text=title, barmode='stack', height=400,
+        yaxis_title_text='金额'
     )
     return fig
 
+@_cached_figure
 def create_professional_line_chart(df, columns, title, colors=None):
     """专业折线图"""
-    style = get_plot_style()
     if colors is None:
         colors = ['#e11d48', '#f97316', '#7c3aed', '#06b6d4', '#10b981']
 
-    df = df.copy()
-    df['日期_str'] = df['日期'].dt.strftime('%Y-%m-%d') if '日期' in df.columns else df.index.astype(str)
-    fig = go.Figure()
+    resolved = _find_columns(df, columns)
+    if not any(resolved.values()):
+        return None  # 一列都没有时不出空图，由调用方显示提示
+    df = _downsample_rows(df, [c for c in resolved.values() if c])
+    date_str = _date_str(df)
+    line_type = _scatter_type(len(df))
+    traces = []
 
     for i, col in enumerate(columns):
-        actual_col = find_column(df, col)
+        actual_col = resolved[col]
         if actual_col:
-            data = df[actual_col].fillna(0)
-            hover_template = f'<b>{actual_col}</b><br>日期: %{{customdata}}<br>数值: %{{y:,.0f}}<extra></extra>'
-            if '封板率' in actual_col:
-                hover_template = f'<b>{actual_col}</b><br>日期: %{{customdata}}<br>数值: %{{y:.1%}}<extra></extra>'
+            data = _col_values(df, actual_col)
+            hover_template = HOVER_PERCENT if '封板率' in actual_col else HOVER_VALUE
             
-            fig.add_trace(go.Scatter(
-                x=df.index, y=data, mode='lines+markers', name=actual_col,
+            traces.append(dict(
+                type=line_type, x=date_str, y=data, mode='lines+markers', name=actual_col,
                 line=dict(color=colors[i % len(colors)], width=3), marker=dict(size=6),
-                hovertemplate=hover_template, customdata=df['日期_str']
+                meta=actual_col, hovertemplate=hover_template
             ))
 
     yaxis_title = '数值'
     yaxis_tickformat = ',.0f'
-    if any('封板率' in col for col in columns if find_column(df, col)):
+    if any('封板率' in col for col in columns if resolved[col]):
         yaxis_title = '百分比'
         yaxis_tickformat = '.0%'
 
+    fig = _new_figure(traces)
     fig.update_layout(
-        title=dict(text=title, x=0.5, font=dict(size=16, color=style["title_color"])),
-        height=400, hovermode='x unified',
-        plot_bgcolor=style["plot_bgcolor"], paper_bgcolor=style["paper_bgcolor"],
-        xaxis=dict(
-            type='category', tickvals=df.index, ticktext=df['日期_str'],
-            gridcolor=style["grid_color"], linecolor=style["line_color"],
-            tickfont=dict(color=style["axis_color"]), title_font=dict(color=style["axis_color"])
-        ),
-        yaxis=dict(
-            title=yaxis_title, gridcolor=style["grid_color"], linecolor=style["line_color"],
-            tickfont=dict(color=style["axis_color"]), title_font=dict(color=style["axis_color"]),
-            tickformat=yaxis_tickformat
-        ),
-        legend=dict(
-            orientation="h", yanchor="bottom", y=1.02, xanchor="center", x=0.5,
-            bgcolor=style["legend_bg"], font=dict(color=style["axis_color"])
-        )
+        title_text=title, height=400,
+        yaxis=dict(title_text=yaxis_title, tickformat=yaxis_tickformat)
     )
     return fig
 
@@ -228,197 +333,107 @@ def create_professional_line_chart(df, columns, title, colors=None):
 # 3. 涨停板市值分布与趋势
 # ==========================
 
-def create_full_limit_up_capital_chart(df):
-    """全天涨停板市值分布：只保留堆叠柱状图"""
-    style = get_plot_style()
-    df = df.copy()
-    df['日期_str'] = df['日期'].dt.strftime('%Y-%m-%d') if '日期' in df.columns else df.index.astype(str)
-
-    columns_map = {
-        '涨停板>100亿(全天）': '#e11d48',
-        '50亿<涨停板<100亿(全天）': '#f97316',
-        '20亿<涨停板<50亿(全天）': '#7c3aed',
-        '涨停板<20亿(全天）': '#06b6d4'
-    }
-
-    fig = go.Figure()
-    # 只保留柱状部分，删除趋势线部分
-    for col, color in columns_map.items():
-        actual = find_column(df, col)
-        if actual:
-            fig.add_trace(go.Bar(
-                x=df.index, y=df[actual].fillna(0),
-                name=col.replace('(全天）', ''),
-                marker_color=color, opacity=0.8, width=0.4,
-                hovertemplate=f'<b>{col.replace("(全天）", "")}</b><br>日期: %{{customdata}}<br>数量: %{{y:,.0f}}<extra></extra>',
-                customdata=df['日期_str']
-            ))
+# 涨停板市值分档：显示名 -> 全天/上午列名、颜色、对比图图例名（导入时一次算好）
+_CAPITAL_BUCKET_DEFS = (
+    ('涨停板>100亿', '>100亿', '#e11d48'),
+    ('50亿<涨停板<100亿', '50-100亿', '#f97316'),
+    ('20亿<涨停板<50亿', '20-50亿', '#7c3aed'),
+    ('涨停板<20亿', '<20亿', '#06b6d4'),
+)
+CAPITAL_BUCKETS = {
+    name: {'full': f'{name}(全天）', 'morning': f'{name}(上午）', 'color': color,
+           'full_label': f'全天 {short}', 'morning_label': f'上午 {short}'}
+    for name, short, color in _CAPITAL_BUCKET_DEFS
+}
 
-    fig.update_layout(
-        title=dict(text='全天涨停板市值分布', x=0.5,  # 修改标题
-                   font=dict(size=14, color=style["title_color"])),
-        barmode='stack', height=420, hovermode='x unified',
-        plot_bgcolor=style["plot_bgcolor"], paper_bgcolor=style["paper_bgcolor"],
-        xaxis=dict(
-            type='category', tickvals=df.index, ticktext=df['日期_str'],
-            gridcolor=style["grid_color"], linecolor=style["line_color"],
-            tickfont=dict(color=style["axis_color"]), title_font=dict(color=style["axis_color"])
-        ),
-        yaxis=dict(
-            title='涨停数量', gridcolor=style["grid_color"], linecolor=style["line_color"],
-            tickfont=dict(color=style["axis_color"]), title_font=dict(color=style["axis_color"])
-        ),
-        legend=dict(
-            orientation="h", yanchor="bottom", y=1.02, xanchor="center", x=0.5,
-            bgcolor=style["legend_bg"], font=dict(size=10, color=style["axis_color"])
+def _capital_dist_chart(df, part, title, mode='stack_bar'):
+    """涨停板市值分布图：part 为 'full'(全天)/'morning'(上午)，mode 为堆叠柱 'stack_bar' 或折线 'line'"""
+    resolved = _find_columns(df, [b[part] for b in CAPITAL_BUCKETS.values()])
+    if not any(resolved.values()):
+        return None
+    is_line = mode == 'line'
+    if is_line:
+        df = _downsample_rows(df, [c for c in resolved.values() if c])
+    date_str = _date_str(df)
+    line_type = _scatter_type(len(df))
+
+    traces = []
+    for name, bucket in CAPITAL_BUCKETS.items():
+        actual = resolved[bucket[part]]
+        if not actual:
+            continue
+        color = bucket['color']
+        trace = dict(
+            x=date_str, y=_col_values(df, actual), name=name,
+            meta=name, hovertemplate=HOVER_COUNT
         )
+        if is_line:
+            trace.update(type=line_type, mode='lines+markers',
+                         line=dict(color=color, width=3), marker=dict(size=6, color=color))
+        else:
+            trace.update(type='bar', marker=dict(color=color), opacity=0.8, width=0.4)
+        traces.append(trace)
+
+    layout = dict(
+        title=dict(text=title, font_size=14), height=420,
+        yaxis_title_text='涨停数量', legend_font_size=10
     )
+    if not is_line:
+        layout['barmode'] = 'stack'
+    fig = _new_figure(traces)
+    fig.update_layout(**layout)
     return fig
 
+@_cached_figure
+def create_full_limit_up_capital_chart(df):
+    """全天涨停板市值分布：只保留堆叠柱状图"""
+    return _capital_dist_chart(df, 'full', '全天涨停板市值分布')
+
+@_cached_figure
 def create_morning_limit_up_capital_chart(df):
     """上午涨停板市值分布：只保留堆叠柱状图"""
-    style = get_plot_style()
-    df = df.copy()
-    df['日期_str'] = df['日期'].dt.strftime('%Y-%m-%d') if '日期' in df.columns else df.index.astype(str)
-
-    columns_map = {
-        '涨停板>100亿(上午）': '#e11d48',
-        '50亿<涨停板<100亿(上午）': '#f97316',
-        '20亿<涨停板<50亿(上午）': '#7c3aed',
-        '涨停板<20亿(上午）': '#06b6d4'
-    }
-
-    fig = go.Figure()
-    # 只保留柱状部分，删除趋势线部分
-    for col, color in columns_map.items():
-        actual = find_column(df, col)
-        if actual:
-            fig.add_trace(go.Bar(
-                x=df.index, y=df[actual].fillna(0),
-                name=col.replace('(上午）', ''),
-                marker_color=color, opacity=0.8, width=0.4,
-                hovertemplate=f'<b>{col.replace("(上午）", "")}</b><br>日期: %{{customdata}}<br>数量: %{{y:,.0f}}<extra></extra>',
-                customdata=df['日期_str']
-            ))
-
-    fig.update_layout(
-        title=dict(text='上午涨停板市值分布', x=0.5,  # 修改标题
-                   font=dict(size=14, color=style["title_color"])),
-        barmode='stack', height=420, hovermode='x unified',
-        plot_bgcolor=style["plot_bgcolor"], paper_bgcolor=style["paper_bgcolor"],
-        xaxis=dict(
-            type='category', tickvals=df.index, ticktext=df['日期_str'],
-            gridcolor=style["grid_color"], linecolor=style["line_color"],
-            tickfont=dict(color=style["axis_color"]), title_font=dict(color=style["axis_color"])
-        ),
-        yaxis=dict(
-            title='涨停数量', gridcolor=style["grid_color"], linecolor=style["line_color"],
-            tickfont=dict(color=style["axis_color"]), title_font=dict(color=style["axis_color"])
-        ),
-        legend=dict(
-            orientation="h", yanchor="bottom", y=1.02, xanchor="center", x=0.5,
-            bgcolor=style["legend_bg"], font=dict(size=10, color=style["axis_color"])
-        )
-    )
-    return fig
+    return _capital_dist_chart(df, 'morning', '上午涨停板市值分布')
 
+@_cached_figure
 def create_full_limit_up_capital_trend_chart(df):
     """全天涨停板市值分布趋势（折线）"""
-    style = get_plot_style()
-    df = df.copy()
-    df['日期_str'] = df['日期'].dt.strftime('%Y-%m-%d') if '日期' in df.columns else df.index.astype(str)
-
-    columns_map = {
-        '涨停板>100亿(全天）': '#e11d48',
-        '50亿<涨停板<100亿(全天）': '#f97316',
-        '20亿<涨停板<50亿(全天）': '#7c3aed',
-        '涨停板<20亿(全天）': '#06b6d4'
-    }
-
-    fig = go.Figure()
-    for col, color in columns_map.items():
-        actual = find_column(df, col)
-        if actual:
-            fig.add_trace(go.Scatter(
-                x=df.index, y=df[actual].fillna(0),
-                mode='lines+markers', name=col.replace('(全天）', ''),
-                line=dict(color=color, width=3), marker=dict(size=6, color=color),
-                hovertemplate=f'<b>{col.replace("(全天）", "")}</b><br>日期: %{{customdata}}<br>数量: %{{y:,.0f}}<extra></extra>',
-                customdata=df['日期_str']
-            ))
-
-    fig.update_layout(
-        title=dict(text='全天涨停板市值分布趋势', x=0.5,
-                   font=dict(size=14, color=style["title_color"])),
-        height=420, hovermode='x unified',
-        plot_bgcolor=style["plot_bgcolor"], paper_bgcolor=style["paper_bgcolor"],
-        xaxis=dict(
-            type='category', tickvals=df.index, ticktext=df['日期_str'],
-            gridcolor=style["grid_color"], linecolor=style["line_color"],
-            tickfont=dict(color=style["axis_color"]), title_font=dict(color=style["axis_color"])
-        ),
-        yaxis=dict(
-            title='涨停数量', gridcolor=style["grid_color"], linecolor=style["line_color"],
-            tickfont=dict(color=style["axis_color"]), title_font=dict(color=style["axis_color"])
-        ),
-        legend=dict(
-            orientation="h", yanchor="bottom", y=1.02, xanchor="center", x=0.5,
-            bgcolor=style["legend_bg"], font=dict(size=10, color=style["axis_color"])
-        )
-    )
-    return fig
+    return _capital_dist_chart(df, 'full', '全天涨停板市值分布趋势', mode='line')
 
+@_cached_figure
 def create_limit_up_capital_comparison_chart(df):
     """涨停板市值分布对比（全天 vs 上午）"""
-    style = get_plot_style()
-    df = df.copy()
-    df['日期_str'] = df['日期'].dt.strftime('%Y-%m-%d') if '日期' in df.columns else df.index.astype(str)
-
-    categories = {
-        'large': {'full': '涨停板>100亿(全天）', 'morning': '涨停板>100亿(上午）', 'color': '#e11d48', 'name': '>100亿'},
-        'mid_large': {'full': '50亿<涨停板<100亿(全天）', 'morning': '50亿<涨停板<100亿(上午）', 'color': '#f97316', 'name': '50-100亿'},
-        'mid_small': {'full': '20亿<涨停板<50亿(全天）', 'morning': '20亿<涨停板<50亿(上午）', 'color': '#7c3aed', 'name': '20-50亿'},
-        'small': {'full': '涨停板<20亿(全天）', 'morning': '涨停板<20亿(上午）', 'color': '#06b6d4', 'name': '<20亿'}
-    }
-
-    fig = go.Figure()
-    for k, v in categories.items():
-        fcol, mcol = find_column(df, v['full']), find_column(df, v['morning'])
+    # 8个列名一次性匹配，降采样和绘图共用
+    resolved = _find_columns(df, [b[part] for b in CAPITAL_BUCKETS.values() for part in ('full', 'morning')])
+    if not any(resolved.values()):
+        return None
+    df = _downsample_rows(df, [c for c in resolved.values() if c])
+    date_str = _date_str(df)
+    line_type = _scatter_type(len(df))
+    traces = []
+    for bucket in CAPITAL_BUCKETS.values():
+        fcol, mcol = resolved[bucket['full']], resolved[bucket['morning']]
+        color = bucket['color']
         if fcol:
-            fig.add_trace(go.Scatter(
-                x=df.index, y=df[fcol].fillna(0),
-                mode='lines+markers', name=f'全天 {v["name"]}',
-                line=dict(color=v['color'], width=3), marker=dict(size=6, color=v['color']),
-                hovertemplate=f'<b>全天 {v["name"]}</b><br>日期: %{{customdata}}<br>数量: %{{y:,.0f}}<extra></extra>',
-                customdata=df['日期_str']
+            name = bucket['full_label']
+            traces.append(dict(
+                type=line_type, x=date_str, y=_col_values(df, fcol),
+                mode='lines+markers', name=name, meta=name,
+                line=dict(color=color, width=3), marker=dict(size=6, color=color),
+                hovertemplate=HOVER_COUNT
             ))
         if mcol:
-            fig.add_trace(go.Scatter(
-                x=df.index, y=df[mcol].fillna(0),
-                mode='lines+markers', name=f'上午 {v["name"]}',
-                line=dict(color=v['color'], width=2, dash='dash'), marker=dict(size=4, color=v['color']),
-                hovertemplate=f'<b>上午 {v["name"]}</b><br>日期: %{{customdata}}<br>数量: %{{y:,.0f}}<extra></extra>',
-                customdata=df['日期_str']
+            name = bucket['morning_label']
+            traces.append(dict(
+                type=line_type, x=date_str, y=_col_values(df, mcol),
+                mode='lines+markers', name=name, meta=name,
+                line=dict(color=color, width=2, dash='dash'), marker=dict(size=4, color=color),
+                hovertemplate=HOVER_COUNT
             ))
 
+    fig = _new_figure(traces)
     fig.update_layout(
-        title=dict(text='涨停板市值分布对比（全天 实线 vs 上午 虚线）', x=0.5,
-                   font=dict(size=14, color=style["title_color"])),
-        height=440, hovermode='x unified',
-        plot_bgcolor=style["plot_bgcolor"], paper_bgcolor=style["paper_bgcolor"],
-        xaxis=dict(
-            type='category', tickvals=df.index, ticktext=df['日期_str'],
-            gridcolor=style["grid_color"], linecolor=style["line_color"],
-            tickfont=dict(color=style["axis_color"]), title_font=dict(color=style["axis_color"])
-        ),
-        yaxis=dict(
-            title='涨停数量', gridcolor=style["grid_color"], linecolor=style["line_color"],
-            tickfont=dict(color=style["axis_color"]), title_font=dict(color=style["axis_color"])
-        ),
-        legend=dict(
-            orientation="h", yanchor="bottom", y=1.02, xanchor="center", x=0.5,
-            bgcolor=style["legend_bg"], font=dict(size=10, color=style["axis_color"])
-        )
+        title=dict(text='涨停板市值分布对比（全天 实线 vs 上午 虚线）', font_size=14), height=440,
+        yaxis_title_text='涨停数量', legend_font_size=10
     )
     return fig
 
@@ -426,593 +441,249 @@ def create_limit_up_capital_comparison_chart(df):
 # 4. 其他核心图表函数
 # ==========================
 
-def create_index_open_chart(df):
-    """指数开盘图表"""
-    style = get_plot_style()
-    df = df.copy()
-    df['日期_str'] = df['日期'].dt.strftime('%Y-%m-%d') if '日期' in df.columns else df.index.astype(str)
-    
-    fig = go.Figure()
-    
-    index_columns = {
-        '沪指开盘': '#e11d48',
-        '深综开盘': '#f97316', 
-        '创开盘金额': '#7c3aed'
-    }
-    
-    for col, color in index_columns.items():
-        actual = find_column(df, col)
-        if actual:
-            fig.add_trace(go.Scatter(
-                x=df.index, y=df[actual].fillna(0), mode='lines+markers',
-                name=actual, line=dict(color=color, width=3), marker=dict(size=6),
-                hovertemplate=f'<b>{actual}</b><br>日期: %{{customdata}}<br>数值: %{{y:,.0f}}<extra></extra>',
-                customdata=df['日期_str']
-            ))
-    
+# 多折线图系列样式：样式名 -> (线宽, 线型, 点大小, 点形状)
+LINE_SERIES_STYLES = {
+    'solid': (3, None, 6, None),
+    'dash': (2, 'dash', 4, None),
+    'solid_diamond': (3, None, 6, 'diamond'),
+    'dash_diamond': (2, 'dash', 4, 'diamond'),
+}
+
+# 多折线图定义：标题、纵轴名、系列 (候选列名, 图例名, 颜色, 样式)
+# 候选列名按顺序取第一个匹配到的列；图例名为 None 时使用实际列名
+LINE_CHART_SPECS = {
+    'index_open': dict(title='三大指数开盘额对比', y_title='开盘金额', series=(
+        (('沪指开盘',), None, '#e11d48', 'solid'),
+        (('深综开盘',), None, '#f97316', 'solid'),
+        (('创开盘金额',), None, '#7c3aed', 'solid'),
+    )),
+    'index_turnover': dict(title='三大指数成交额对比', y_title='成交额', series=(
+        (('沪额全天',), None, '#e11d48', 'solid'),
+        (('深综全天',), None, '#f97316', 'solid'),
+        (('创额全天',), None, '#7c3aed', 'solid'),
+    )),
+    'up_down_flat': dict(title='市场涨跌平家数分布', y_title='家数', series=(
+        (('上涨',), '上涨家数', '#e11d48', 'solid'),
+        (('下跌',), '下跌家数', '#16a34a', 'solid'),
+        (('平盘/停牌', '平盘停牌'), '平盘/停牌家数', '#94a3b8', 'solid'),
+    )),
+    'four_line': dict(title='涨停跌停与大幅波动分析', y_title='数量', series=(
+        (('全天涨停',), '全天涨停', '#e11d48', 'solid'),
+        (('全天跌停',), '全天跌停', '#16a34a', 'solid'),
+        (('涨幅大于10%',), '涨幅大于10%', '#e11d48', 'dash'),
+        (('跌幅于大于10%', '跌幅大于10%'), '跌幅大于10%', '#16a34a', 'dash'),
+    )),
+    'limit_down': dict(title='跌停数据细分（按板块）', y_title='跌停数量', series=(
+        (('主板跌停数',), '主板跌停数', '#22c55e', 'solid'),
+        (('创业板跌停数',), '创业板跌停数', '#15803d', 'solid'),
+        (('北证跌停数',), '北证跌停数', '#94a3b8', 'dash'),
+    )),
+    'enhanced_limit_up': dict(title='涨停连板与高度板分析（全天实线+上午虚线）', y_title='数量', series=(
+        (('全天涨停',), '全天涨停数', '#e11d48', 'solid'),
+        (('全天涨停连接板',), '全天连板数', '#7c3aed', 'solid'),
+        (('全天高度板',), '全天高度板', '#fbbf24', 'solid_diamond'),
+        (('上午涨停',), '上午涨停数', '#e11d48', 'dash'),
+        (('上午涨停连接板',), '上午连板数', '#7c3aed', 'dash'),
+        (('上午高度板',), '上午高度板', '#fbbf24', 'dash_diamond'),
+    )),
+    'morning_limit_up': dict(title='上午涨停数量分析', y_title='数量', series=(
+        (('上午涨停',), '上午涨停数', '#f97316', 'solid'),
+        (('上午涨停连接板',), '上午连板数', '#ea580c', 'solid'),
+        (('上午高度板',), '上午高度板', '#dc2626', 'solid_diamond'),
+    )),
+}
+
+def _multi_line_chart(df, spec):
+    """按 LINE_CHART_SPECS 中的定义绘制多折线图；所需列全部缺失时返回 None"""
+    series = spec['series']
+    cols = _find_columns(df, [t for targets, *_ in series for t in targets])
+    resolved = [next((cols[t] for t in targets if cols[t]), None) for targets, *_ in series]
+    if not any(resolved):
+        return None  # 一列都没有时不出空图，由调用方显示提示
+    df = _downsample_rows(df, [c for c in resolved if c])
+    date_str = _date_str(df)
+    line_type = _scatter_type(len(df))
+    traces = []
+
+    for (_, name, color, style), actual in zip(series, resolved):
+        if not actual:
+            continue
+        name = name or actual
+        width, dash, size, symbol = LINE_SERIES_STYLES[style]
+        line = dict(color=color, width=width)
+        marker = dict(size=size, color=color)
+        if dash:
+            line['dash'] = dash
+        if symbol:
+            marker['symbol'] = symbol
+        traces.append(dict(
+            type=line_type, x=date_str, y=_col_values(df, actual), mode='lines+markers',
+            name=name, line=line, marker=marker,
+            meta=name, hovertemplate=HOVER_VALUE
+        ))
+
+    fig = _new_figure(traces)
     fig.update_layout(
-        title=dict(text='三大指数开盘额对比', x=0.5, font=dict(size=16, color=style["title_color"])),
-        height=400, hovermode='x unified',
-        plot_bgcolor=style["plot_bgcolor"], paper_bgcolor=style["paper_bgcolor"],
-        xaxis=dict(
-            type='category', tickvals=df.index, ticktext=df['日期_str'],
-            gridcolor=style["grid_color"], linecolor=style["line_color"],
-            tickfont=dict(color=style["axis_color"]), title_font=dict(color=style["axis_color"])
-        ),
-        yaxis=dict(
-            title='开盘金额', gridcolor=style["grid_color"], linecolor=style["line_color"],
-            tickfont=dict(color=style["axis_color"]), title_font=dict(color=style["axis_color"])
-        ),
-        legend=dict(
-            orientation="h", yanchor="bottom", y=1.02, xanchor="center", x=0.5,
-            bgcolor=style["legend_bg"], font=dict(color=style["axis_color"])
-        )
+        title_text=spec['title'], height=400,
+        yaxis_title_text=spec['y_title']
+    )
+    return fig
+
+MARGIN_TREND_WINDOW = 5  # 融资余额趋势线：N 日均线
+
+def _zero_line():
+    """0 轴虚线参考线（与 add_hline(y=0) 相同的 shape，直接写入布局）"""
+    return dict(type='line', xref='x domain', x0=0, x1=1, yref='y', y0=0, y1=0,
+                line=dict(dash='dash', color=get_plot_style()['line_color'], width=1.5))
+
+def _signed_bar_line_chart(date_str, values, name, line_color, title, y_title):
+    """红涨绿跌柱（宽0.4）+ 细折线 + 0 轴参考线"""
+    colors = np.where(values < 0, '#16a34a', '#e11d48')
+    fig = _new_figure([
+        # 1. 涨跌柱子（宽0.4）
+        dict(type='bar', x=date_str, y=values,
+             name=name, width=0.4,
+             marker=dict(color=colors), opacity=0.8,
+             meta=name, hovertemplate=HOVER_VALUE),
+        # 2. 折线（细线+圆点）
+        dict(type=_scatter_type(len(values)), x=date_str, y=values, mode='lines+markers', name='趋势线',
+             line=dict(color=line_color, width=1.58),
+             marker=dict(size=5, line=dict(width=1, color='white')),
+             meta='趋势', hovertemplate=HOVER_VALUE)
+    ])
+
+    fig.update_layout(
+        title_text=title, height=400,
+        shapes=[_zero_line()],  # 0 轴参考线
+        yaxis_title_text=y_title
     )
     return fig
 
+@_cached_figure
+def create_index_open_chart(df):
+    """指数开盘图表"""
+    return _multi_line_chart(df, LINE_CHART_SPECS['index_open'])
+
+@_cached_figure
 def create_margin_balance_chart(df):
     """融资余额图表 - 柱状图+趋势线"""
-    style = get_plot_style()
-    df = df.copy()
-    df['日期_str'] = df['日期'].dt.strftime('%Y-%m-%d') if '日期' in df.columns else df.index.astype(str)
+    date_str = _date_str(df)
     
     balance_col = find_column(df, '两融资余额')
     if not balance_col:
         return None
         
-    balance_data = df[balance_col].fillna(0)
-    
-    fig = go.Figure()
-    
-    # 柱状图
-    fig.add_trace(go.Bar(
-        x=df.index, y=balance_data, name='两融资余额',
-        marker_color='#10b981', opacity=0.85, width=0.4,
-        hovertemplate='<b>两融资余额</b><br>日期: %{customdata}<br>数值: %{y:,.0f}<extra></extra>',
-        customdata=df['日期_str']
-    ))
-    
-    # 趋势线
-    fig.add_trace(go.Scatter(
-        x=df.index, y=balance_data, mode='lines+markers', name='融资余额趋势线',
-        line=dict(color='#7c3aed', width=2), marker=dict(size=6, color='#7c3aed'),
-        hovertemplate='<b>融资余额趋势</b><br>日期: %{customdata}<br>数值: %{y:,.0f}<extra></extra>',
-        customdata=df['日期_str']
-    ))
+    balance_data = _col_values(df, balance_col)
+    # 趋势线用N日均线（缺失日不计入均值），不再把柱子的数据原样再画一遍
+    trend = df[balance_col].rolling(MARGIN_TREND_WINDOW, min_periods=1).mean()
+    trend_data = np.nan_to_num(trend.to_numpy(dtype=np.float32, na_value=np.nan), nan=0.0)
+    
+    trend_name = f'融资余额{MARGIN_TREND_WINDOW}日均线'
+    fig = _new_figure([
+        # 柱状图
+        dict(type='bar', x=date_str, y=balance_data, name='两融资余额',
+             marker=dict(color='#10b981'), opacity=0.85, width=0.4,
+             meta='两融资余额', hovertemplate=HOVER_VALUE),
+        # 趋势线（N日均线）
+        dict(type=_scatter_type(len(df)), x=date_str, y=trend_data, mode='lines+markers', name=trend_name,
+             line=dict(color='#7c3aed', width=2), marker=dict(size=6, color='#7c3aed'),
+             meta=trend_name, hovertemplate=HOVER_VALUE)
+    ])
     
     fig.update_layout(
-        title=dict(text='融资余额分析（柱状图+趋势线）', x=0.5, 
-                   font=dict(size=16, color=style["title_color"])),
-        height=400, hovermode='x unified',
-        plot_bgcolor=style["plot_bgcolor"], paper_bgcolor=style["paper_bgcolor"],
-        xaxis=dict(
-            type='category', tickvals=df.index, ticktext=df['日期_str'],
-            gridcolor=style["grid_color"], linecolor=style["line_color"],
-            tickfont=dict(color=style["axis_color"]), title_font=dict(color=style["axis_color"])
-        ),
-        yaxis=dict(
-            title='两融资余额', gridcolor=style["grid_color"], linecolor=style["line_color"],
-            tickfont=dict(color=style["axis_color"]), title_font=dict(color=style["axis_color"])
-        ),
-        legend=dict(
-            orientation="h", yanchor="bottom", y=1.02, xanchor="center", x=0.5,
-            bgcolor=style["legend_bg"], font=dict(color=style["axis_color"])
-        )
+        title_text='融资余额分析（柱状图+趋势线）', height=400,
+        yaxis_title_text='两融资余额'
     )
     return fig
 
+@_cached_figure
 def create_margin_net_chart(df):
     """融资净买入：折线+涨跌柱（宽0.4）"""
-    style = get_plot_style()
-    df = df.copy()
-    df['日期_str'] = df['日期'].dt.strftime('%Y-%m-%d') if '日期' in df.columns else df.index.astype(str)
-
     net_col = find_column(df, '融资净买入')
     if not net_col:
         return None
-    net_data = df[net_col].fillna(0)
-
-    fig = go.Figure()
-
-    # 1. 涨跌柱子（宽0.4）
-    colors = ['#16a34a' if v < 0 else '#e11d48' for v in net_data]
-    fig.add_trace(go.Bar(
-        x=df.index, y=net_data,
-        name='融资净买入', width=0.4,
-        marker_color=colors, opacity=0.8,
-        hovertemplate='<b>融资净买入</b><br>日期: %{customdata}<br>数值: %{y:,.0f}<extra></extra>',
-        customdata=df['日期_str']
-    ))
-
-    # 2. 折线（细线+圆点）
-    fig.add_trace(go.Scatter(
-        x=df.index, y=net_data, mode='lines+markers', name='趋势线',
-        line=dict(color='#f59e0b', width=1.58),
-        marker=dict(size=5, line=dict(width=1, color='white')),
-        hovertemplate='<b>趋势</b><br>日期: %{customdata}<br>数值: %{y:,.0f}<extra></extra>',
-        customdata=df['日期_str']
-    ))
-
-    # 0 轴参考线
-    fig.add_hline(y=0, line_dash='dash', line_color=style['line_color'], line_width=1.5)
-
-    fig.update_layout(
-        title=dict(text='融资净买入（红涨绿跌）', x=0.5, font=dict(size=16, color=style["title_color"])),
-        height=400, hovermode='x unified',
-        plot_bgcolor=style["plot_bgcolor"], paper_bgcolor=style["paper_bgcolor"],
-        xaxis=dict(
-            type='category', tickvals=df.index, ticktext=df['日期_str'],
-            gridcolor=style["grid_color"], linecolor=style["line_color"],
-            tickfont=dict(color=style["axis_color"]), title_font=dict(color=style["axis_color"])
-        ),
-        yaxis=dict(
-            title='融资净买入', gridcolor=style["grid_color"], linecolor=style["line_color"],
-            tickfont=dict(color=style["axis_color"]), title_font=dict(color=style["axis_color"])
-        ),
-        legend=dict(
-            orientation="h", yanchor="bottom", y=1.02, xanchor="center", x=0.5,
-            bgcolor=style["legend_bg"], font=dict(color=style["axis_color"])
-        )
-    )
-    return fig
+    return _signed_bar_line_chart(_date_str(df), _col_values(df, net_col), '融资净买入', '#f59e0b',
+                                  '融资净买入（红涨绿跌）', '融资净买入')
 
+@_cached_figure
 def create_daily_diff_chart(df):
     """今昨差额：折线+涨跌柱（宽0.4）"""
-    style = get_plot_style()
-    df = df.copy()
-    df['日期_str'] = df['日期'].dt.strftime('%Y-%m-%d') if '日期' in df.columns else df.index.astype(str)
+    date_str = _date_str(df)
 
     diff_col = find_column(df, '今昨差额')
-    if not diff_col:
+    if diff_col:
+        diff_data = _col_values(df, diff_col)
+    else:
         total_col = find_column(df, '全天总额')
-        if total_col:
-            df_sorted = df.sort_values('日期' if '日期' in df.columns else df.index)
-            df_sorted['今昨差额'] = df_sorted[total_col].diff().fillna(0)
-            df = df_sorted.sort_index(ascending=False)
-            diff_col = '今昨差额'
-        else:
+        if not total_col:
             return None
-
-    diff_data = df[diff_col].fillna(0)
-
-    fig = go.Figure()
-
-    # 1. 涨跌柱子（宽0.4）
-    colors = ['#16a34a' if v < 0 else '#e11d48' for v in diff_data]
-    fig.add_trace(go.Bar(
-        x=df.index, y=diff_data,
-        name='今昨差额', width=0.4,
-        marker_color=colors, opacity=0.8,
-        hovertemplate='<b>今昨差额</b><br>日期: %{customdata}<br>数值: %{y:,.0f}<extra></extra>',
-        customdata=df['日期_str']
-    ))
-
-    # 2. 折线（细线+圆点）
-    fig.add_trace(go.Scatter(
-        x=df.index, y=diff_data, mode='lines+markers', name='趋势线',
-        line=dict(color='#06b6d4', width=1.58),
-        marker=dict(size=5, line=dict(width=1, color='white')),
-        hovertemplate='<b>趋势</b><br>日期: %{customdata}<br>数值: %{y:,.0f}<extra></extra>',
-        customdata=df['日期_str']
-    ))
-
-    # 0 轴参考线
-    fig.add_hline(y=0, line_dash='dash', line_color=style['line_color'], line_width=1.5)
-
-    fig.update_layout(
-        title=dict(text='全天总额今昨差额（红涨绿跌）', x=0.5, font=dict(size=16, color=style["title_color"])),
-        height=400, hovermode='x unified',
-        plot_bgcolor=style["plot_bgcolor"], paper_bgcolor=style["paper_bgcolor"],
-        xaxis=dict(
-            type='category', tickvals=df.index, ticktext=df['日期_str'],
-            gridcolor=style["grid_color"], linecolor=style["line_color"],
-            tickfont=dict(color=style["axis_color"]), title_font=dict(color=style["axis_color"])
-        ),
-        yaxis=dict(
-            title='差额金额', gridcolor=style["grid_color"], linecolor=style["line_color"],
-            tickfont=dict(color=style["axis_color"]), title_font=dict(color=style["axis_color"])
-        ),
-        legend=dict(
-            orientation="h", yanchor="bottom", y=1.02, xanchor="center", x=0.5,
-            bgcolor=style["legend_bg"], font=dict(color=style["axis_color"])
-        )
-    )
-    return fig
-
+        # 按日期顺序逐日求差（argsort + np.diff，不构造排序后的表）；结果按索引倒序排列
+        order = np.argsort(np.asarray(df['日期'] if '日期' in df.columns else df.index), kind='stable')
+        total = df[total_col].to_numpy(dtype=np.float64, na_value=np.nan)[order]
+        diff = np.empty_like(total)
+        diff[order] = np.diff(total, prepend=np.nan)
+        rows = np.argsort(df.index.to_numpy(), kind='stable')[::-1]
+        diff_data = np.nan_to_num(diff[rows], nan=0.0).astype(np.float32)
+        date_str = date_str[rows]
+
+    return _signed_bar_line_chart(date_str, diff_data, '今昨差额', '#06b6d4',
+                                  '全天总额今昨差额（红涨绿跌）', '差额金额')
+
+@_cached_figure
 def create_index_turnover_chart(df):
     """指数成交额图表"""
-    style = get_plot_style()
-    df = df.copy()
-    df['日期_str'] = df['日期'].dt.strftime('%Y-%m-%d') if '日期' in df.columns else df.index.astype(str)
-    
-    fig = go.Figure()
-    
-    turnover_columns = {
-        '沪额全天': '#e11d48',
-        '深综全天': '#f97316',
-        '创额全天': '#7c3aed'
-    }
-    
-    for col, color in turnover_columns.items():
-        actual = find_column(df, col)
-        if actual:
-            fig.add_trace(go.Scatter(
-                x=df.index, y=df[actual].fillna(0), mode='lines+markers',
-                name=actual, line=dict(color=color, width=3), marker=dict(size=6),
-                hovertemplate=f'<b>{actual}</b><br>日期: %{{customdata}}<br>数值: %{{y:,.0f}}<extra></extra>',
-                customdata=df['日期_str']
-            ))
-    
-    fig.update_layout(
-        title=dict(text='三大指数成交额对比', x=0.5, font=dict(size=16, color=style["title_color"])),
-        height=400, hovermode='x unified',
-        plot_bgcolor=style["plot_bgcolor"], paper_bgcolor=style["paper_bgcolor"],
-        xaxis=dict(
-            type='category', tickvals=df.index, ticktext=df['日期_str'],
-            gridcolor=style["grid_color"], linecolor=style["line_color"],
-            tickfont=dict(color=style["axis_color"]), title_font=dict(color=style["axis_color"])
-        ),
-        yaxis=dict(
-            title='成交额', gridcolor=style["grid_color"], linecolor=style["line_color"],
-            tickfont=dict(color=style["axis_color"]), title_font=dict(color=style["axis_color"])
-        ),
-        legend=dict(
-            orientation="h", yanchor="bottom", y=1.02, xanchor="center", x=0.5,
-            bgcolor=style["legend_bg"], font=dict(color=style["axis_color"])
-        )
-    )
-    return fig
+    return _multi_line_chart(df, LINE_CHART_SPECS['index_turnover'])
 
+@_cached_figure
 def create_up_down_flat_chart(df):
     """涨跌平家数图表"""
-    style = get_plot_style()
-    df = df.copy()
-    df['日期_str'] = df['日期'].dt.strftime('%Y-%m-%d') if '日期' in df.columns else df.index.astype(str)
-    
-    fig = go.Figure()
-    
-    # 上涨（红色）
-    up_col = find_column(df, '上涨')
-    if up_col:
-        fig.add_trace(go.Scatter(
-            x=df.index, y=df[up_col].fillna(0), mode='lines+markers', name='上涨家数',
-            line=dict(color='#e11d48', width=3), marker=dict(size=6, color='#e11d48'),
-            hovertemplate='<b>上涨家数</b><br>日期: %{customdata}<br>数值: %{y:,.0f}<extra></extra>',
-            customdata=df['日期_str']
-        ))
-    
-    # 下跌（绿色）
-    down_col = find_column(df, '下跌')
-    if down_col:
-        fig.add_trace(go.Scatter(
-            x=df.index, y=df[down_col].fillna(0), mode='lines+markers', name='下跌家数',
-            line=dict(color='#16a34a', width=3), marker=dict(size=6, color='#16a34a'),
-            hovertemplate='<b>下跌家数</b><br>日期: %{customdata}<br>数值: %{y:,.0f}<extra></extra>',
-            customdata=df['日期_str']
-        ))
-    
-    # 平盘/停牌（灰色）
-    flat_col = find_column(df, '平盘/停牌') or find_column(df, '平盘停牌')
-    if flat_col:
-        fig.add_trace(go.Scatter(
-            x=df.index, y=df[flat_col].fillna(0), mode='lines+markers', name='平盘/停牌家数',
-            line=dict(color='#94a3b8', width=3), marker=dict(size=6, color='#94a3b8'),
-            hovertemplate='<b>平盘/停牌家数</b><br>日期: %{customdata}<br>数值: %{y:,.0f}<extra></extra>',
-            customdata=df['日期_str']
-        ))
-    
-    fig.update_layout(
-        title=dict(text='市场涨跌平家数分布', x=0.5, font=dict(size=16, color=style["title_color"])),
-        height=400, hovermode='x unified',
-        plot_bgcolor=style["plot_bgcolor"], paper_bgcolor=style["paper_bgcolor"],
-        xaxis=dict(
-            type='category', tickvals=df.index, ticktext=df['日期_str'],
-            gridcolor=style["grid_color"], linecolor=style["line_color"],
-            tickfont=dict(color=style["axis_color"]), title_font=dict(color=style["axis_color"])
-        ),
-        yaxis=dict(
-            title='家数', gridcolor=style["grid_color"], linecolor=style["line_color"],
-            tickfont=dict(color=style["axis_color"]), title_font=dict(color=style["axis_color"])
-        ),
-        legend=dict(
-            orientation="h", yanchor="bottom", y=1.02, xanchor="center", x=0.5,
-            bgcolor=style["legend_bg"], font=dict(color=style["axis_color"])
-        )
-    )
-    return fig
+    return _multi_line_chart(df, LINE_CHART_SPECS['up_down_flat'])
 
+@_cached_figure
 def create_four_line_chart(df):
     """四线图表（涨停跌停等）"""
-    style = get_plot_style()
-    df = df.copy()
-    df['日期_str'] = df['日期'].dt.strftime('%Y-%m-%d') if '日期' in df.columns else df.index.astype(str)
-    
-    fig = go.Figure()
-    
-    # 全天涨停 - 红色实线
-    up_col = find_column(df, '全天涨停')
-    if up_col:
-        fig.add_trace(go.Scatter(
-            x=df.index, y=df[up_col].fillna(0), mode='lines+markers', name='全天涨停',
-            line=dict(color='#e11d48', width=3), marker=dict(size=6, color='#e11d48'),
-            hovertemplate='<b>全天涨停</b><br>日期: %{customdata}<br>数值: %{y:,.0f}<extra></extra>',
-            customdata=df['日期_str']
-        ))
-    
-    # 全天跌停 - 绿色实线
-    down_col = find_column(df, '全天跌停')
-    if down_col:
-        fig.add_trace(go.Scatter(
-            x=df.index, y=df[down_col].fillna(0), mode='lines+markers', name='全天跌停',
-            line=dict(color='#16a34a', width=3), marker=dict(size=6, color='#16a34a'),
-            hovertemplate='<b>全天跌停</b><br>日期: %{customdata}<br>数值: %{y:,.0f}<extra></extra>',
-            customdata=df['日期_str']
-        ))
-    
-    # 涨幅大于10% - 红色虚线
-    up_10_col = find_column(df, '涨幅大于10%')
-    if up_10_col:
-        fig.add_trace(go.Scatter(
-            x=df.index, y=df[up_10_col].fillna(0), mode='lines+markers', name='涨幅大于10%',
-            line=dict(color='#e11d48', width=2, dash='dash'), marker=dict(size=4, color='#e11d48'),
-            hovertemplate='<b>涨幅大于10%</b><br>日期: %{customdata}<br>数值: %{y:,.0f}<extra></extra>',
-            customdata=df['日期_str']
-        ))
-    
-    # 跌幅大于10% - 绿色虚线
-    down_10_col = find_column(df, '跌幅于大于10%') or find_column(df, '跌幅大于10%')
-    if down_10_col:
-        fig.add_trace(go.Scatter(
-            x=df.index, y=df[down_10_col].fillna(0), mode='lines+markers', name='跌幅大于10%',
-            line=dict(color='#16a34a', width=2, dash='dash'), marker=dict(size=4, color='#16a34a'),
-            hovertemplate='<b>跌幅大于10%</b><br>日期: %{customdata}<br>数值: %{y:,.0f}<extra></extra>',
-            customdata=df['日期_str']
-        ))
-    
-    fig.update_layout(
-        title=dict(text='涨停跌停与大幅波动分析', x=0.5, font=dict(size=16, color=style["title_color"])),
-        height=400, hovermode='x unified',
-        plot_bgcolor=style["plot_bgcolor"], paper_bgcolor=style["paper_bgcolor"],
-        xaxis=dict(
-            type='category', tickvals=df.index, ticktext=df['日期_str'],
-            gridcolor=style["grid_color"], linecolor=style["line_color"],
-            tickfont=dict(color=style["axis_color"]), title_font=dict(color=style["axis_color"])
-        ),
-        yaxis=dict(
-            title='数量', gridcolor=style["grid_color"], linecolor=style["line_color"],
-            tickfont=dict(color=style["axis_color"]), title_font=dict(color=style["axis_color"])
-        ),
-        legend=dict(
-            orientation="h", yanchor="bottom", y=1.02, xanchor="center", x=0.5,
-            bgcolor=style["legend_bg"], font=dict(color=style["axis_color"])
-        )
-    )
-    return fig
+    return _multi_line_chart(df, LINE_CHART_SPECS['four_line'])
 
+@_cached_figure
 def create_limit_down_chart(df):
     """跌停细分图表"""
-    style = get_plot_style()
-    df = df.copy()
-    df['日期_str'] = df['日期'].dt.strftime('%Y-%m-%d') if '日期' in df.columns else df.index.astype(str)
-    
-    fig = go.Figure()
-    
-    # 主板跌停数 - 亮绿色
-    main_col = find_column(df, '主板跌停数')
-    if main_col:
-        fig.add_trace(go.Scatter(
-            x=df.index, y=df[main_col].fillna(0), mode='lines+markers', name='主板跌停数',
-            line=dict(color='#22c55e', width=3), marker=dict(size=6, color='#22c55e'),
-            hovertemplate='<b>主板跌停数</b><br>日期: %{customdata}<br>数值: %{y:,.0f}<extra></extra>',
-            customdata=df['日期_str']
-        ))
-    
-    # 创业板跌停数 - 暗绿色
-    gem_col = find_column(df, '创业板跌停数')
-    if gem_col:
-        fig.add_trace(go.Scatter(
-            x=df.index, y=df[gem_col].fillna(0), mode='lines+markers', name='创业板跌停数',
-            line=dict(color='#15803d', width=3), marker=dict(size=6, color='#15803d'),
-            hovertemplate='<b>创业板跌停数</b><br>日期: %{customdata}<br>数值: %{y:,.0f}<extra></extra>',
-            customdata=df['日期_str']
-        ))
-    
-    # 北证跌停数 - 虚线灰色
-    bse_col = find_column(df, '北证跌停数')
-    if bse_col:
-        fig.add_trace(go.Scatter(
-            x=df.index, y=df[bse_col].fillna(0), mode='lines+markers', name='北证跌停数',
-            line=dict(color='#94a3b8', width=2, dash='dash'), marker=dict(size=4, color='#94a3b8'),
-            hovertemplate='<b>北证跌停数</b><br>日期: %{customdata}<br>数值: %{y:,.0f}<extra></extra>',
-            customdata=df['日期_str']
-        ))
-    
-    fig.update_layout(
-        title=dict(text='跌停数据细分（按板块）', x=0.5, font=dict(size=16, color=style["title_color"])),
-        height=400, hovermode='x unified',
-        plot_bgcolor=style["plot_bgcolor"], paper_bgcolor=style["paper_bgcolor"],
-        xaxis=dict(
-            type='category', tickvals=df.index, ticktext=df['日期_str'],
-            gridcolor=style["grid_color"], linecolor=style["line_color"],
-            tickfont=dict(color=style["axis_color"]), title_font=dict(color=style["axis_color"])
-        ),
-        yaxis=dict(
-            title='跌停数量', gridcolor=style["grid_color"], linecolor=style["line_color"],
-            tickfont=dict(color=style["axis_color"]), title_font=dict(color=style["axis_color"])
-        ),
-        legend=dict(
-            orientation="h", yanchor="bottom", y=1.02, xanchor="center", x=0.5,
-            bgcolor=style["legend_bg"], font=dict(color=style["axis_color"])
-        )
-    )
-    return fig
+    return _multi_line_chart(df, LINE_CHART_SPECS['limit_down'])
 
+@_cached_figure
 def create_enhanced_limit_up_analysis_chart(df):
     """增强版涨停连板与高度板分析（全天实线 + 上午虚线）"""
-    style = get_plot_style()
-    df = df.copy()
-    df['日期_str'] = df['日期'].dt.strftime('%Y-%m-%d') if '日期' in df.columns else df.index.astype(str)
-    
-    fig = go.Figure()
-    
-    # 全天数据 - 实线
-    full_up_col = find_column(df, '全天涨停')
-    if full_up_col:
-        fig.add_trace(go.Scatter(
-            x=df.index, y=df[full_up_col].fillna(0), mode='lines+markers', name='全天涨停数',
-            line=dict(color='#e11d48', width=3), marker=dict(size=6),
-            hovertemplate='<b>全天涨停数</b><br>日期: %{customdata}<br>数值: %{y:,.0f}<extra></extra>',
-            customdata=df['日期_str']
-        ))
-    
-    full_chain_col = find_column(df, '全天涨停连接板')
-    if full_chain_col:
-        fig.add_trace(go.Scatter(
-            x=df.index, y=df[full_chain_col].fillna(0), mode='lines+markers', name='全天连板数',
-            line=dict(color='#7c3aed', width=3), marker=dict(size=6),
-            hovertemplate='<b>全天连板数</b><br>日期: %{customdata}<br>数值: %{y:,.0f}<extra></extra>',
-            customdata=df['日期_str']
-        ))
-    
-    full_height_col = find_column(df, '全天高度板')
-    if full_height_col:
-        fig.add_trace(go.Scatter(
-            x=df.index, y=df[full_height_col].fillna(0), mode='lines+markers', name='全天高度板',
-            line=dict(color='#fbbf24', width=3), marker=dict(size=6, symbol='diamond'),
-            hovertemplate='<b>全天高度板</b><br>日期: %{customdata}<br>数值: %{y:,.0f}<extra></extra>',
-            customdata=df['日期_str']
-        ))
-    
-    # 上午数据 - 虚线
-    morning_up_col = find_column(df, '上午涨停')
-    if morning_up_col:
-        fig.add_trace(go.Scatter(
-            x=df.index, y=df[morning_up_col].fillna(0), mode='lines+markers', name='上午涨停数',
-            line=dict(color='#e11d48', width=2, dash='dash'), marker=dict(size=4),
-            hovertemplate='<b>上午涨停数</b><br>日期: %{customdata}<br>数值: %{y:,.0f}<extra></extra>',
-            customdata=df['日期_str']
-        ))
-    
-    morning_chain_col = find_column(df, '上午涨停连接板')
-    if morning_chain_col:
-        fig.add_trace(go.Scatter(
-            x=df.index, y=df[morning_chain_col].fillna(0), mode='lines+markers', name='上午连板数',
-            line=dict(color='#7c3aed', width=2, dash='dash'), marker=dict(size=4),
-            hovertemplate='<b>上午连板数</b><br>日期: %{customdata}<br>数值: %{y:,.0f}<extra></extra>',
-            customdata=df['日期_str']
-        ))
-    
-    morning_height_col = find_column(df, '上午高度板')
-    if morning_height_col:
-        fig.add_trace(go.Scatter(
-            x=df.index, y=df[morning_height_col].fillna(0), mode='lines+markers', name='上午高度板',
-            line=dict(color='#fbbf24', width=2, dash='dash'), marker=dict(size=4, symbol='diamond'),
-            hovertemplate='<b>上午高度板</b><br>日期: %{customdata}<br>数值: %{y:,.0f}<extra></extra>',
-            customdata=df['日期_str']
-        ))
-    
-    fig.update_layout(
-        title=dict(text='涨停连板与高度板分析（全天实线+上午虚线）', x=0.5, 
-                   font=dict(size=16, color=style["title_color"])),
-        height=400, hovermode='x unified',
-        plot_bgcolor=style["plot_bgcolor"], paper_bgcolor=style["paper_bgcolor"],
-        xaxis=dict(
-            type='category', tickvals=df.index, ticktext=df['日期_str'],
-            gridcolor=style["grid_color"], linecolor=style["line_color"],
-            tickfont=dict(color=style["axis_color"]), title_font=dict(color=style["axis_color"])
-        ),
-        yaxis=dict(
-            title='数量', gridcolor=style["grid_color"], linecolor=style["line_color"],
-            tickfont=dict(color=style["axis_color"]), title_font=dict(color=style["axis_color"])
-        ),
-        legend=dict(
-            orientation="h", yanchor="bottom", y=1.02, xanchor="center", x=0.5,
-            bgcolor=style["legend_bg"], font=dict(color=style["axis_color"])
-        )
-    )
-    return fig
+    return _multi_line_chart(df, LINE_CHART_SPECS['enhanced_limit_up'])
 
+@_cached_figure
 def create_morning_limit_up_chart(df):
     """上午涨停图表"""
-    style = get_plot_style()
-    df = df.copy()
-    df['日期_str'] = df['日期'].dt.strftime('%Y-%m-%d') if '日期' in df.columns else df.index.astype(str)
-    
-    fig = go.Figure()
-    
-    morning_up_col = find_column(df, '上午涨停')
-    if morning_up_col:
-        fig.add_trace(go.Scatter(
-            x=df.index, y=df[morning_up_col].fillna(0), mode='lines+markers', name='上午涨停数',
-            line=dict(color='#f97316', width=3), marker=dict(size=6),
-            hovertemplate='<b>上午涨停数</b><br>日期: %{customdata}<br>数值: %{y:,.0f}<extra></extra>',
-            customdata=df['日期_str']
-        ))
-    
-    morning_chain_col = find_column(df, '上午涨停连接板')
-    if morning_chain_col:
-        fig.add_trace(go.Scatter(
-            x=df.index, y=df[morning_chain_col].fillna(0), mode='lines+markers', name='上午连板数',
-            line=dict(color='#ea580c', width=3), marker=dict(size=6),
-            hovertemplate='<b>上午连板数</b><br>日期: %{customdata}<br>数值: %{y:,.0f}<extra></extra>',
-            customdata=df['日期_str']
-        ))
-    
-    morning_height_col = find_column(df, '上午高度板')
-    if morning_height_col:
-        fig.add_trace(go.Scatter(
-            x=df.index, y=df[morning_height_col].fillna(0), mode='lines+markers', name='上午高度板',
-            line=dict(color='#dc2626', width=3), marker=dict(size=6, symbol='diamond'),
-            hovertemplate='<b>上午高度板</b><br>日期: %{customdata}<br>数值: %{y:,.0f}<extra></extra>',
-            customdata=df['日期_str']
-        ))
-    
-    fig.update_layout(
-        title=dict(text='上午涨停数量分析', x=0.5, font=dict(size=16, color=style["title_color"])),
-        height=400, hovermode='x unified',
-        plot_bgcolor=style["plot_bgcolor"], paper_bgcolor=style["paper_bgcolor"],
-        xaxis=dict(
-            type='category', tickvals=df.index, ticktext=df['日期_str'],
-            gridcolor=style["grid_color"], linecolor=style["line_color"],
-            tickfont=dict(color=style["axis_color"]), title_font=dict(color=style["axis_color"])
-        ),
-        yaxis=dict(
-            title='数量', gridcolor=style["grid_color"], linecolor=style["line_color"],
-            tickfont=dict(color=style["axis_color"]), title_font=dict(color=style["axis_color"])
-        ),
-        legend=dict(
-            orientation="h", yanchor="bottom", y=1.02, xanchor="center", x=0.5,
-            bgcolor=style["legend_bg"], font=dict(color=style["axis_color"])
-        )
-    )
-    return fig
+    return _multi_line_chart(df, LINE_CHART_SPECS['morning_limit_up'])
 
 # ==========================
 # 5. 主要显示函数
 # ==========================
 
+def _lazy_section(title):
+    """非首屏分区：标题下放一个开关，打开后才构建和渲染该分区的图表"""
+    st.markdown(f'<div class="section-header">{title}</div>', unsafe_allow_html=True)
+    return st.toggle(f'显示{title}', value=False)
+
+def _render(fig, empty_message):
+    """有图就渲染，没有数据时给出提示"""
+    if fig:
+        st.plotly_chart(fig, config=PLOTLY_CONFIG, use_container_width=True)
+    else:
+        st.info(empty_message)
+
+def _chart_frame(df):
+    """图表分区用的数据：裁掉文本列（行业/概念榜单等），日期列始终保留"""
+    # 每次图表调用都要对传入的 df 算缓存指纹，长文本列的哈希占大头
+    keep = [col for col, dtype in df.dtypes.items() if dtype != object or col == '日期']
+    return df if len(keep) == len(df.columns) else df[keep]
+
 def show_fund_flow(df):
     """显示资金流向分析"""
+    df = _chart_frame(df)
     col1, col2 = st.columns(2)
     
     with col1:
@@ -1020,17 +691,11 @@ def show_fund_flow(df):
             df, ['北向成交额', '北向净值'], 
             '北向资金流向分析', ['#7c3aed', '#06b6d4']
         )
-        if fig_north:
-            st.plotly_chart(fig_north, config=PLOTLY_CONFIG, use_container_width=True)
-        else:
-            st.info("暂无北向资金数据")
+        _render(fig_north, "暂无北向资金数据")
     
     with col2:
         fig_index_open = create_index_open_chart(df)
-        if fig_index_open:
-            st.plotly_chart(fig_index_open, config=PLOTLY_CONFIG, use_container_width=True)
-        else:
-            st.info("暂无指数开盘数据")
+        _render(fig_index_open, "暂无指数开盘数据")
     
     # 两融数据分析
     st.markdown('<div class="section-header">两融数据分析</div>', unsafe_allow_html=True)
@@ -1038,192 +703,148 @@ def show_fund_flow(df):
     
     with col1:
         fig_margin_balance = create_margin_balance_chart(df)
-        if fig_margin_balance:
-            st.plotly_chart(fig_margin_balance, config=PLOTLY_CONFIG, use_container_width=True)
-        else:
-            st.info("数据中暂无两融资余额信息")
+        _render(fig_margin_balance, "数据中暂无两融资余额信息")
     
     with col2:
         fig_margin_net = create_margin_net_chart(df)
-        if fig_margin_net:
-            st.plotly_chart(fig_margin_net, config=PLOTLY_CONFIG, use_container_width=True)
-        else:
-            st.info("数据中暂无融资净买入信息")
+        _render(fig_margin_net, "数据中暂无融资净买入信息")
 
 def show_market_turnover(df):
     """显示市场成交趋势分析"""
+    df = _chart_frame(df)
     # 市场总额与今昨差分析
     st.markdown('<div class="section-header">市场总额与今昨差分析</div>', unsafe_allow_html=True)
     col1, col2 = st.columns(2)
     
     with col1:
         fig_total = create_grouped_bar_chart(df, '上午总额', '全天总额', '市场总成交额对比（上午vs全天）')
-        if fig_total:
-            st.plotly_chart(fig_total, config=PLOTLY_CONFIG, use_container_width=True)
-        else:
-            st.info("暂无市场总额数据")
+        _render(fig_total, "暂无市场总额数据")
     
     with col2:
         fig_diff = create_daily_diff_chart(df)
-        if fig_diff:
-            st.plotly_chart(fig_diff, config=PLOTLY_CONFIG, use_container_width=True)
-        else:
-            st.info("暂无今昨差额数据")
+        _render(fig_diff, "暂无今昨差额数据")
     
     # 各市场成交趋势
-    st.markdown('<div class="section-header">各市场成交趋势</div>', unsafe_allow_html=True)
+    if not _lazy_section('各市场成交趋势'):
+        return
     col1, col2 = st.columns(2)
     
     with col1:
         fig_sh = create_grouped_bar_chart(df, '沪额上午', '沪额全天', '沪市成交额趋势（上午vs全天）')
-        if fig_sh:
-            st.plotly_chart(fig_sh, config=PLOTLY_CONFIG, use_container_width=True)
-        else:
-            st.info("暂无沪市成交数据")
+        _render(fig_sh, "暂无沪市成交数据")
     
     with col2:
         fig_sz = create_grouped_bar_chart(df, '深综上午', '深综全天', '深市成交额趋势（上午vs全天）')
-        if fig_sz:
-            st.plotly_chart(fig_sz, config=PLOTLY_CONFIG, use_container_width=True)
-        else:
-            st.info("暂无深市成交数据")
+        _render(fig_sz, "暂无深市成交数据")
     
     col1, col2 = st.columns(2)
     
     with col1:
         fig_cy = create_grouped_bar_chart(df, '创额上午', '创额全天', '创业板成交额趋势（上午vs全天）')
-        if fig_cy:
-            st.plotly_chart(fig_cy, config=PLOTLY_CONFIG, use_container_width=True)
-        else:
-            st.info("暂无创业板成交数据")
+        _render(fig_cy, "暂无创业板成交数据")
     
     with col2:
         fig_index = create_index_turnover_chart(df)
-        if fig_index:
-            st.plotly_chart(fig_index, config=PLOTLY_CONFIG, use_container_width=True)
-        else:
-            st.info("暂无指数成交数据")
+        _render(fig_index, "暂无指数成交数据")
 
 def show_limit_up_down(df):
     """显示涨跌停分析"""
+    df = _chart_frame(df)
     # 市场情绪分析
     st.markdown('<div class="section-header">市场情绪分析</div>', unsafe_allow_html=True)
     col1, col2 = st.columns(2)
     
     with col1:
         fig_up_down_flat = create_up_down_flat_chart(df)
-        if fig_up_down_flat:
-            st.plotly_chart(fig_up_down_flat, config=PLOTLY_CONFIG, use_container_width=True)
-        else:
-            st.info("暂无涨跌平数据")
+        _render(fig_up_down_flat, "暂无涨跌平数据")
     
     with col2:
         fig_board_rate = create_professional_line_chart(df, ['全天封板率'], '市场封板率趋势', ['#f97316'])
-        if fig_board_rate:
-            st.plotly_chart(fig_board_rate, config=PLOTLY_CONFIG, use_container_width=True)
-        else:
-            st.info("暂无封板率数据")
+        _render(fig_board_rate, "暂无封板率数据")
     
     col1, col2 = st.columns(2)
     
     with col1:
         fig_four_line = create_four_line_chart(df)
-        if fig_four_line:
-            st.plotly_chart(fig_four_line, config=PLOTLY_CONFIG, use_container_width=True)
-        else:
-            st.info("暂无四线数据")
+        _render(fig_four_line, "暂无四线数据")
     
     with col2:
         fig_limit_down = create_limit_down_chart(df)
-        if fig_limit_down:
-            st.plotly_chart(fig_limit_down, config=PLOTLY_CONFIG, use_container_width=True)
-        else:
-            st.info("暂无跌停细分数据")
+        _render(fig_limit_down, "暂无跌停细分数据")
 
     # 涨停板深度分析
-    st.markdown('<div class="section-header">涨停板深度分析</div>', unsafe_allow_html=True)
-    col1, col2 = st.columns(2)
-    
-    with col1:
-        # 显示主板涨停数、创业板涨停数、北证涨停数
-        fig_board_limit = create_professional_line_chart(
-            df, ['主板涨停数', '创业板涨停数', '北证涨停数'], 
-            '板块全天涨停板：主板涨停数、创业板涨停数、北证涨停数', ['#e11d48', '#f97316', '#7c3aed']
-        )
-        if fig_board_limit:
-            st.plotly_chart(fig_board_limit, config=PLOTLY_CONFIG, use_container_width=True)
-        else:
-            st.info("暂无板块涨停数据")
-    
-    with col2:
-        fig_limit_chain_enhanced = create_enhanced_limit_up_analysis_chart(df)
-        if fig_limit_chain_enhanced:
-            st.plotly_chart(fig_limit_chain_enhanced, config=PLOTLY_CONFIG, use_container_width=True)
-        else:
-            st.info("暂无涨停连板数据")
-    
-    col1, col2 = st.columns(2)
-    
-    with col1:
-        fig_morning_limit = create_morning_limit_up_chart(df)
-        if fig_morning_limit:
-            st.plotly_chart(fig_morning_limit, config=PLOTLY_CONFIG, use_container_width=True)
-        else:
-            st.info("暂无上午涨停数据")
-    
-    with col2:
-        fig_volatility = create_professional_line_chart(
-            df, ['涨幅大于10%', '跌幅于大于10%'], 
-            '大幅波动股票数量', ['#e11d48', '#16a34a']
-        )
-        if fig_volatility:
-            st.plotly_chart(fig_volatility, config=PLOTLY_CONFIG, use_container_width=True)
-        else:
-            st.info("暂无大幅波动数据")
+    if _lazy_section('涨停板深度分析'):
+        col1, col2 = st.columns(2)
+    
+        with col1:
+            # 显示主板涨停数、创业板涨停数、北证涨停数
+            fig_board_limit = create_professional_line_chart(
+                df, ['主板涨停数', '创业板涨停数', '北证涨停数'], 
+                '板块全天涨停板：主板涨停数、创业板涨停数、北证涨停数', ['#e11d48', '#f97316', '#7c3aed']
+            )
+            _render(fig_board_limit, "暂无板块涨停数据")
+    
+        with col2:
+            fig_limit_chain_enhanced = create_enhanced_limit_up_analysis_chart(df)
+            _render(fig_limit_chain_enhanced, "暂无涨停连板数据")
+    
+        col1, col2 = st.columns(2)
+    
+        with col1:
+            fig_morning_limit = create_morning_limit_up_chart(df)
+            _render(fig_morning_limit, "暂无上午涨停数据")
+    
+        with col2:
+            fig_volatility = create_professional_line_chart(
+                df, ['涨幅大于10%', '跌幅于大于10%'], 
+                '大幅波动股票数量', ['#e11d48', '#16a34a']
+            )
+            _render(fig_volatility, "暂无大幅波动数据")
 
     # 涨停板市值分布分析 
-    st.markdown('<div class="section-header">涨停板市值分布分析</div>', unsafe_allow_html=True)
+    if not _lazy_section('涨停板市值分布分析'):
+        return
     
     # 全天市值分布
     col1, col2 = st.columns(2)
     
     with col1:
         fig_full_capital = create_full_limit_up_capital_chart(df)
-        if fig_full_capital:
-            st.plotly_chart(fig_full_capital, config=PLOTLY_CONFIG, use_container_width=True)
-        else:
-            st.info("全天涨停板市值分布数据暂不可用")
+        _render(fig_full_capital, "全天涨停板市值分布数据暂不可用")
     
     with col2:
         fig_morning_capital = create_morning_limit_up_capital_chart(df)
-        if fig_morning_capital:
-            st.plotly_chart(fig_morning_capital, config=PLOTLY_CONFIG, use_container_width=True)
-        else:
-            st.info("上午涨停板市值分布数据暂不可用")
+        _render(fig_morning_capital, "上午涨停板市值分布数据暂不可用")
     
     # 趋势和对比分析
     col1, col2 = st.columns(2)
     
     with col1:
         fig_full_trend = create_full_limit_up_capital_trend_chart(df)
-        if fig_full_trend:
-            st.plotly_chart(fig_full_trend, config=PLOTLY_CONFIG, use_container_width=True)
-        else:
-            st.info("全天涨停板市值分布趋势数据暂不可用")
+        _render(fig_full_trend, "全天涨停板市值分布趋势数据暂不可用")
     
     with col2:
         fig_comparison = create_limit_up_capital_comparison_chart(df)
-        if fig_comparison:
-            st.plotly_chart(fig_comparison, config=PLOTLY_CONFIG, use_container_width=True)
-        else:
-            st.info("涨停板市值分布对比数据暂不可用")
+        _render(fig_comparison, "涨停板市值分布对比数据暂不可用")
 
 # ==========================
 # 6. 其他功能函数
 # ==========================
 
+@st.cache_data(show_spinner=False, hash_funcs={pd.DataFrame: _frame_fingerprint})
+def _numeric_summary(df):
+    """数值列统计表（describe），数据不变的重跑直接复用；没有数值列时返回 None"""
+    numeric_cols = df.select_dtypes(include=[np.number]).columns
+    if len(numeric_cols) == 0:
+        return None
+    return df[numeric_cols].describe()
+
 def show_detailed_analysis(df):
     """显示详细数据分析"""
+    # 诊断和关键指标用到的列一次匹配好，下面直接查字典
+    cols = _find_columns(df, ['今昨差额', '全天跌停', '主板跌停数', '创业板跌停数', '北证跌停数',
+                              '全天总额', '北向净值', '上涨', '下跌', '全天涨停'])
+
     # 数据诊断面板
     st.markdown("#### 🔍 数据诊断")
     
@@ -1231,8 +852,9 @@ def show_detailed_analysis(df):
     
     with col1:
         # 检查今昨差额
-        if find_column(df, '今昨差额'):
-            zero_diff = (df[find_column(df, '今昨差额')] == 0).sum()
+        if cols['今昨差额']:
+            diff_values = df[cols['今昨差额']].to_numpy()
+            zero_diff = diff_values.size - np.count_nonzero(diff_values)  # 不生成布尔掩码
             if zero_diff > 0:
                 st.warning(f"今昨差额为零: {zero_diff}条")
             else:
@@ -1242,9 +864,9 @@ def show_detailed_analysis(df):
     
     with col2:
         # 检查跌停数据
-        if find_column(df, '全天跌停'):
+        if cols['全天跌停']:
             st.success("全天跌停数据存在")
-        elif any(find_column(df, col) for col in ['主板跌停数', '创业板跌停数', '北证跌停数']):
+        elif any(cols[col] for col in ['主板跌停数', '创业板跌停数', '北证跌停数']):
             st.info("可使用板块跌停数据")
         else:
             st.error("缺少跌停数据")
@@ -1252,7 +874,7 @@ def show_detailed_analysis(df):
     with col3:
         # 检查基本数据完整性
         required_cols = ['全天总额', '北向净值', '上涨', '下跌']
-        missing_cols = [col for col in required_cols if not find_column(df, col)]
+        missing_cols = [col for col in required_cols if not cols[col]]
         if missing_cols:
             st.error(f"缺失列: {', '.join(missing_cols)}")
         else:
@@ -1262,24 +884,24 @@ def show_detailed_analysis(df):
     st.markdown("#### 数据统计概览")
     
     # 数值列的基本统计
-    numeric_cols = df.select_dtypes(include=[np.number]).columns
-    if len(numeric_cols) > 0:
-        st.dataframe(df[numeric_cols].describe(), use_container_width=True)
+    summary = _numeric_summary(df)
+    if summary is not None:
+        st.dataframe(summary, use_container_width=True)
     
     # 最新交易日数据
     st.markdown("#### 最新交易日详情")
     if len(df) > 0:
-        latest_data = df.iloc[0].to_frame().T  # 第一行是最新数据
+        latest_data = df.head(1)  # 第一行是最新数据；head保留各列原dtype
         st.dataframe(latest_data, use_container_width=True)
         
         # 显示关键指标
         st.markdown("#### 关键指标验证")
         key_metrics = ['全天总额', '今昨差额', '北向净值', '全天涨停', '全天跌停']
-        for metric in key_metrics:
-            actual_metric = find_column(df, metric)
-            if actual_metric:
-                value = df[actual_metric].iloc[0]
-                st.write(f"{actual_metric}: {value}")
+        # 各指标一次取出同一行，汇成一张表输出
+        metric_cols = list(dict.fromkeys(cols[m] for m in key_metrics if cols[m]))
+        if metric_cols:
+            metric_values = df[metric_cols].iloc[0]
+            st.dataframe(metric_values.to_frame('值'), use_container_width=True)
 
 def show_prediction_results(prediction_df, target):
     """显示预测结果"""
@@ -1289,7 +911,11 @@ def show_prediction_results(prediction_df, target):
     fig = go.Figure()
     
     if 'actual' in prediction_df.columns and 'predicted' in prediction_df.columns:
-        fig.add_trace(go.Scatter(
+        # 预测区间较长时先按LTTB降采样，再按点数选择 WebGL 渲染
+        prediction_df = _downsample_rows(prediction_df, ['actual', 'predicted'])
+        line_type = _scatter_type(len(prediction_df))
+        fig.add_trace(dict(
+            type=line_type,
             x=prediction_df.index,
             y=prediction_df['actual'],
             mode='lines+markers',
@@ -1297,7 +923,8 @@ def show_prediction_results(prediction_df, target):
             line=dict(color='#e11d48', width=3)
         ))
         
-        fig.add_trace(go.Scatter(
+        fig.add_trace(dict(
+            type=line_type,
             x=prediction_df.index,
             y=prediction_df['predicted'],
             mode='lines+markers',